@@ -3,7 +3,7 @@ LED controls for the Elmo costume
 """
 
 try:
-    from typing import List
+    from typing import List, Tuple
 except ImportError:
     # ignore the error on the RP2040
     pass
@@ -13,8 +13,8 @@ import board
 import random
 import math
 import neopixel
-import time
 
+from frame_timer import FrameTimer
 from palette import Palette, ColorPoint
 from rgb import RGB
 
@@ -24,6 +24,8 @@ LOOP_DURATION_SECONDS = 10
 TOTAL_FRAME_COUNT = FRAMES_PER_SECOND * LOOP_DURATION_SECONDS
 SPEED_MULTIPLIER = 15.0
 LED_BRIGHTNESS = 0.2
+# Print achieved FPS and the worst frame time to the serial console, for tuning
+PRINT_FRAME_STATS = False
 
 
 def get_ring_pixels() -> neopixel.NeoPixel:
@@ -60,26 +62,38 @@ def get_fire_color_map() -> List[RGB]:
         ]
     )
 
-    # Fill out the color map
-    color_map: List[RGB] = [None] * TOTAL_FRAME_COUNT
-    for i in range(0, TOTAL_FRAME_COUNT):
-        percent = i / float(TOTAL_FRAME_COUNT)
-        color_map[i] = fire_palette.find_color(percent)
-    return color_map
+    # Fill out the color map in one pass over the palette segments
+    return fire_palette.color_map(TOTAL_FRAME_COUNT)
+
+
+def pack_color_map(color_map: List[RGB]) -> Tuple[List[Tuple], List[Tuple]]:
+    """
+    Pixel values in the order each strip expects, built once so the frame loop allocates nothing
+    """
+    ring_colors = [color.as_grbw() for color in color_map]
+    flex_colors = [color.as_bgr() for color in color_map]
+    return ring_colors, flex_colors
 
 
 def main():
     ring_pixels = get_ring_pixels()
     flex_pixels = get_flex_pixels()
-    color_map = get_fire_color_map()
+    ring_colors, flex_colors = pack_color_map(get_fire_color_map())
 
     current_percent = 0
     target_percent = max(random.random() / 4.0 + 0.75, 1.0)
     speed = random.random() / SPEED_MULTIPLIER + 0.01
 
+    frame_timer = FrameTimer(FRAMES_PER_SECOND)
+
     while True:
+        # Speeds are per frame at the target rate, scale them by the time that actually passed
+        frame_step = frame_timer.tick() * FRAMES_PER_SECOND
+        if PRINT_FRAME_STATS and frame_timer.reported:
+            print(frame_timer)
+
         # Use a ladder algorithm to randomly move up and down the color palette
-        current_percent += speed
+        current_percent += speed * frame_step
         if speed > 0:
             # going up
             if current_percent >= target_percent:
@@ -97,19 +111,14 @@ def main():
         color_idx = min(
             math.floor(current_percent * TOTAL_FRAME_COUNT), TOTAL_FRAME_COUNT - 1
         )
-        color = color_map[color_idx]
-
-        # Update ring LEDs
-        for led_idx in range(len(ring_pixels)):
-            ring_pixels[led_idx] = color.as_grbw()
 
-        # Update the flexible LEDs
-        for led_idx in range(len(flex_pixels)):
-            flex_pixels[led_idx] = color.as_bgr()
+        # Every LED shows the same color, fill writes the whole pixel buffer in one call
+        ring_pixels.fill(ring_colors[color_idx])
+        flex_pixels.fill(flex_colors[color_idx])
 
         ring_pixels.show()
         flex_pixels.show()
-        time.sleep(1.0 / FRAMES_PER_SECOND)
+        frame_timer.sleep()
 
 
 if __name__ == "__main__":
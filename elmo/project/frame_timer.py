@@ -0,0 +1,60 @@
+import time
+
+NS_PER_SECOND = 1000000000
+NS_PER_MS = 1000000
+# Never step the animation by more than this, e.g. after the board stalls on USB
+MAX_STEP_SECONDS = 0.25
+
+
+class FrameTimer:
+    """
+    Frame budget bookkeeping for the LED loop, on the monotonic clock.
+
+    tick() starts a frame and returns the seconds since the previous one, sleep() waits out
+    whatever is left of the frame budget. Achieved FPS and the worst frame time (work only,
+    without the sleep) are updated every `report_seconds`.
+    """
+
+    def __init__(self, frames_per_second: int, report_seconds: float = 5.0):
+        self._budget_ns = NS_PER_SECOND // frames_per_second
+        self._report_ns = int(report_seconds * NS_PER_SECOND)
+        self._frame_start_ns = time.monotonic_ns()
+        self._report_start_ns = self._frame_start_ns
+        self._report_frames = 0
+        self._report_worst_ns = 0
+
+        self.fps = 0.0
+        self.worst_frame_ms = 0.0
+        # True only on the frame fps and worst_frame_ms were updated
+        self.reported = False
+
+    def tick(self) -> float:
+        now_ns = time.monotonic_ns()
+        elapsed_ns = now_ns - self._frame_start_ns
+        self._frame_start_ns = now_ns
+
+        self._report_frames += 1
+        self.reported = False
+        if now_ns - self._report_start_ns >= self._report_ns:
+            self.fps = (
+                self._report_frames * NS_PER_SECOND / (now_ns - self._report_start_ns)
+            )
+            self.worst_frame_ms = self._report_worst_ns / NS_PER_MS
+            self._report_start_ns = now_ns
+            self._report_frames = 0
+            self._report_worst_ns = 0
+            self.reported = True
+
+        return min(elapsed_ns / NS_PER_SECOND, MAX_STEP_SECONDS)
+
+    def sleep(self):
+        work_ns = time.monotonic_ns() - self._frame_start_ns
+        if work_ns > self._report_worst_ns:
+            self._report_worst_ns = work_ns
+
+        remaining_ns = self._budget_ns - work_ns
+        if remaining_ns > 0:
+            time.sleep(remaining_ns / NS_PER_SECOND)
+
+    def __str__(self):
+        return f"FPS: {self.fps:.1f}, worst frame: {self.worst_frame_ms:.1f} ms"
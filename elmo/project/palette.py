@@ -1,36 +1,102 @@
-try:
-    from typing import List
-except ImportError:
-    pass # ignore the error on the microcontroller
-
-from rgb import RGB
-from __future__ import annotations
-
-
-class ColorPoint:
-    def __init__(self, point: float, color: RGB):
-        self.point = point
-        self.color = color
-
-
-class Palette:
-    color_points: List[ColorPoint]
-
-    def __init__(self, color_points: List[ColorPoint]):
-        self.color_points = sorted(color_points, key=lambda l: l.point)
-
-    def find_color(self, point: float) -> RGB:
-        # assumes at least 2 color points
-        first_idx = 0
-        p1 = self.color_points[0]
-        p2 = self.color_points[1]
-
-        while True:
-            if point >= p1.point and point <= p2.point:
-                # found the middle
-                ratio = (point - p1.point) / (p2.point - p1.point)
-                return p1.color.interpolate(p2.color, ratio)
-            else:
-                first_idx += 1
-                p1 = p2
-                p2 = self.color_points[first_idx]
+from __future__ import annotations
+
+try:
+    from typing import List
+except ImportError:
+    pass # ignore the error on the microcontroller
+
+from rgb import RGB
+
+
+class ColorPoint:
+    def __init__(self, point: float, color: RGB):
+        self.point = point
+        self.color = color
+
+
+class Palette:
+    """
+    Gradient between sorted color points. Segment starts and per channel slopes are computed
+    once, so a lookup is a binary search and a multiply.
+    """
+
+    color_points: List[ColorPoint]
+
+    def __init__(self, color_points: List[ColorPoint]):
+        if len(color_points) < 2:
+            raise ValueError("A palette needs at least 2 color points")
+
+        self.color_points = sorted(color_points, key=lambda l: l.point)
+        self._starts = [p.point for p in self.color_points]
+        # The change per unit of point across each segment, flat for points at the same spot
+        self._slopes = []
+        for idx in range(len(self.color_points) - 1):
+            p1 = self.color_points[idx]
+            p2 = self.color_points[idx + 1]
+            width = p2.point - p1.point
+            if width == 0:
+                self._slopes.append((0.0, 0.0, 0.0))
+            else:
+                self._slopes.append(
+                    (
+                        (p2.color.r - p1.color.r) / width,
+                        (p2.color.g - p1.color.g) / width,
+                        (p2.color.b - p1.color.b) / width,
+                    )
+                )
+
+    def find_color(self, point: float) -> RGB:
+        # Points outside the palette get the color of the nearest end
+        if point <= self._starts[0]:
+            return self._end_color(0)
+        if point >= self._starts[-1]:
+            return self._end_color(-1)
+
+        return self._segment_color(self._find_segment(point), point)
+
+    def color_map(self, count: int) -> List[RGB]:
+        """
+        Colors of `count` evenly spaced points from 0.0 up to 1.0, walking the segments in one pass
+        """
+        color_map = [None] * count
+        last_segment = len(self._slopes) - 1
+        segment = 0
+        for i in range(count):
+            point = i / float(count)
+            if point <= self._starts[0]:
+                color_map[i] = self._end_color(0)
+                continue
+            if point >= self._starts[-1]:
+                color_map[i] = self._end_color(-1)
+                continue
+
+            while segment < last_segment and self._starts[segment + 1] <= point:
+                segment += 1
+            color_map[i] = self._segment_color(segment, point)
+        return color_map
+
+    def _find_segment(self, point: float) -> int:
+        # Binary search for the last segment starting at or before point, no bisect on CircuitPython
+        low = 0
+        high = len(self._slopes) - 1
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self._starts[mid] <= point:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    def _segment_color(self, segment: int, point: float) -> RGB:
+        color = self.color_points[segment].color
+        r_slope, g_slope, b_slope = self._slopes[segment]
+        offset = point - self._starts[segment]
+        return RGB(
+            int(color.r + offset * r_slope),
+            int(color.g + offset * g_slope),
+            int(color.b + offset * b_slope),
+        )
+
+    def _end_color(self, idx: int) -> RGB:
+        color = self.color_points[idx].color
+        return RGB(int(color.r), int(color.g), int(color.b))
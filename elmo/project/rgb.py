@@ -1,3 +1,6 @@
+from __future__ import annotations
+
+
 class RGB:
     """
     RGB colors class
@@ -0,0 +1,3 @@
+"""
+Host stand-in for the adafruit_fancyled library
+"""
@@ -0,0 +1,7 @@
+"""
+Host stand-in for adafruit_fancyled.adafruit_fancyled.
+
+code.py imports the module but uses none of its names, so nothing of the library is
+reimplemented here. Anything the board code starts to use should fail on import rather than
+run against an approximation of the library.
+"""
@@ -0,0 +1,123 @@
+"""
+Host stand-in for the CircuitPython neopixel module. Pixels are kept in memory and every
+assignment and show() is reported to the simulator recorder.
+"""
+
+from typing import List, Sequence, Tuple, Union
+
+import recorder
+
+RGB = "RGB"
+GRB = "GRB"
+RGBW = "RGBW"
+GRBW = "GRBW"
+
+Color = Union[int, Tuple[int, ...]]
+
+
+class NeoPixel:
+    def __init__(
+        self,
+        pin,
+        n: int,
+        *,
+        bpp: int = 3,
+        brightness: float = 1.0,
+        auto_write: bool = True,
+        pixel_order: str = None,
+    ):
+        if pixel_order is None:
+            pixel_order = GRBW if bpp == 4 else GRB
+        self.pin = pin
+        self.n = n
+        self.bpp = len(pixel_order)
+        self.auto_write = auto_write
+        self.pixel_order = pixel_order
+        self._brightness = min(max(brightness, 0.0), 1.0)
+        self._pixels: List[Tuple[int, ...]] = [(0,) * self.bpp] * n
+
+    @property
+    def brightness(self) -> float:
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, value: float):
+        self._brightness = min(max(value, 0.0), 1.0)
+        if self.auto_write:
+            self.show()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, index: Union[int, slice]):
+        return self._pixels[index]
+
+    def __setitem__(
+        self, index: Union[int, slice], value: Union[Color, Sequence[Color]]
+    ):
+        if isinstance(index, slice):
+            indices = range(*index.indices(self.n))
+            values = [self._color(color) for color in value]
+            if len(values) != len(indices):
+                raise ValueError("Slice and input sequence size do not match.")
+            for idx, color in zip(indices, values):
+                self._pixels[idx] = color
+            count = len(indices)
+        else:
+            if index < 0:
+                index += self.n
+            if not 0 <= index < self.n:
+                raise IndexError("Pixel index out of range")
+            self._pixels[index] = self._color(value)
+            count = 1
+
+        self._record_write(count)
+
+    def fill(self, color: Color):
+        self._pixels = [self._color(color)] * self.n
+        self._record_write(self.n)
+
+    def show(self):
+        if recorder.RECORDER is not None:
+            recorder.RECORDER.record_show(repr(self.pin), self._wire_bytes())
+
+    def deinit(self):
+        self._pixels = [(0,) * self.bpp] * self.n
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.deinit()
+
+    def _color(self, value: Color) -> Tuple[int, ...]:
+        if isinstance(value, int):
+            # Packed 0xWWRRGGBB like the CircuitPython pixel buffer
+            value = (
+                (value >> 16) & 0xFF,
+                (value >> 8) & 0xFF,
+                value & 0xFF,
+                (value >> 24) & 0xFF,
+            )
+            value = value[: self.bpp]
+        if len(value) == 3 and self.bpp == 4:
+            value = (*value, 0)
+        if len(value) != self.bpp:
+            raise ValueError(f"Expected {self.bpp} color channels, got {len(value)}")
+        return tuple(min(max(int(channel), 0), 255) for channel in value)
+
+    def _wire_bytes(self) -> bytes:
+        # Values are given in RGB(W) order and sent in the strip's pixel order
+        order = ["RGBW".index(channel) for channel in self.pixel_order]
+        brightness = self._brightness
+        return bytes(
+            int(pixel[channel] * brightness)
+            for pixel in self._pixels
+            for channel in order
+        )
+
+    def _record_write(self, count: int):
+        if recorder.RECORDER is not None:
+            recorder.RECORDER.record_write(repr(self.pin), count)
+        if self.auto_write:
+            self.show()
@@ -0,0 +1,82 @@
+import csv
+import json
+import time
+from typing import Callable, Dict, List
+
+# Every simulated NeoPixel reports its writes and shows to this recorder
+RECORDER = None
+
+
+class ShowRecord:
+    def __init__(self, time_s: float, pin: str, writes: int, pixels: bytes):
+        self.time_s = time_s
+        self.pin = pin
+        # Pixel assignments since the previous show of the same strip
+        self.writes = writes
+        # The bytes sent down the wire, in the strip's pixel order with brightness applied
+        self.pixels = pixels
+
+    def as_dict(self) -> Dict:
+        return {
+            "time_s": self.time_s,
+            "pin": self.pin,
+            "writes": self.writes,
+            "pixels": self.pixels.hex(),
+        }
+
+
+class Recorder:
+    """
+    Timestamped pixel writes and show() calls of the simulated strips
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._pending_writes: Dict[str, int] = {}
+        self.shows: List[ShowRecord] = []
+        self.write_count = 0
+
+    def record_write(self, pin: str, count: int):
+        self.write_count += count
+        self._pending_writes[pin] = self._pending_writes.get(pin, 0) + count
+
+    def record_show(self, pin: str, pixels: bytes):
+        writes = self._pending_writes.pop(pin, 0)
+        self.shows.append(ShowRecord(self._clock(), pin, writes, pixels))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Show count, rate and interval per strip
+        """
+        times: Dict[str, List[float]] = {}
+        for show in self.shows:
+            times.setdefault(show.pin, []).append(show.time_s)
+
+        summary = {}
+        for pin, pin_times in times.items():
+            intervals = [b - a for a, b in zip(pin_times, pin_times[1:])]
+            elapsed_s = pin_times[-1] - pin_times[0]
+            summary[pin] = {
+                "shows": len(pin_times),
+                "fps": len(intervals) / elapsed_s if elapsed_s > 0 else 0.0,
+                "mean_interval_ms": (
+                    1000 * sum(intervals) / len(intervals) if intervals else 0.0
+                ),
+                "worst_interval_ms": 1000 * max(intervals, default=0.0),
+            }
+        return summary
+
+    def dump(self, path: str):
+        """
+        Write every show to path, as JSON if it ends in .json and CSV otherwise
+        """
+        records = [show.as_dict() for show in self.shows]
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump(records, f, indent=2)
+            return
+
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["time_s", "pin", "writes", "pixels"])
+            writer.writeheader()
+            writer.writerows(records)
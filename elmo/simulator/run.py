@@ -0,0 +1,74 @@
+"""
+Run the elmo board code unchanged on the host, against simulated pixels and a virtual clock
+"""
+
+import argparse
+import json
+import os
+import random
+import runpy
+import sys
+import time
+
+import recorder
+from recorder import Recorder
+from virtual_clock import SimulationFinished, VirtualClock
+
+SIMULATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.join(os.path.dirname(SIMULATOR_DIR), "project")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--code", default=os.path.join(PROJECT_DIR, "code.py"), help="board code to run"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=60.0, help="simulated time to run for"
+    )
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="really sleep instead of skipping sleeps",
+    )
+    parser.add_argument("--seed", type=int, help="seed random for a repeatable run")
+    parser.add_argument("--trace", help="dump every show() to this CSV or .json file")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    # The board code imports its own modules next to it, and the stand-ins from here
+    sys.path.insert(1, os.path.dirname(os.path.abspath(args.code)))
+
+    clock = VirtualClock(args.seconds, args.realtime)
+    recorder.RECORDER = Recorder(clock.monotonic)
+    clock.install()
+    real_start_s = time.perf_counter()
+    try:
+        runpy.run_path(args.code, run_name="__main__")
+    except SimulationFinished:
+        pass
+    finally:
+        clock.uninstall()
+    real_s = time.perf_counter() - real_start_s
+
+    simulated_s = clock.monotonic()
+    print(
+        json.dumps(
+            {
+                "simulated_s": simulated_s,
+                "real_s": real_s,
+                "speedup": simulated_s / real_s if real_s > 0 else 0.0,
+                "pixel_writes": recorder.RECORDER.write_count,
+                "strips": recorder.RECORDER.summary(),
+            },
+            indent=2,
+        )
+    )
+    if args.trace:
+        recorder.RECORDER.dump(args.trace)
+
+
+if __name__ == "__main__":
+    main()
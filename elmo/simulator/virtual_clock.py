@@ -0,0 +1,51 @@
+import time
+from typing import Callable, Dict, Optional
+
+
+class SimulationFinished(Exception):
+    pass
+
+
+class VirtualClock:
+    """
+    Monotonic time for simulated board code. Time spent working is real, but sleeps return
+    immediately and only move the clock forward, so code runs as fast as the host allows while
+    seeing the same timeline it would on hardware.
+
+    Once `duration_s` of simulated time has passed, the next sleep raises SimulationFinished.
+    """
+
+    def __init__(self, duration_s: Optional[float] = None, realtime: bool = False):
+        self._duration_ns = None if duration_s is None else int(duration_s * 1000000000)
+        self._realtime = realtime
+        self._start_ns = time.perf_counter_ns()
+        self._slept_ns = 0
+        self._originals: Dict[str, Callable] = {}
+
+    def monotonic_ns(self) -> int:
+        return time.perf_counter_ns() - self._start_ns + self._slept_ns
+
+    def monotonic(self) -> float:
+        return self.monotonic_ns() / 1000000000
+
+    def sleep(self, seconds: float):
+        if self._realtime:
+            self._originals.get("sleep", time.sleep)(seconds)
+        else:
+            self._slept_ns += int(seconds * 1000000000)
+
+        if self._duration_ns is not None and self.monotonic_ns() >= self._duration_ns:
+            raise SimulationFinished()
+
+    def install(self):
+        """
+        Replace the time module's clock and sleep, so board code needs no changes
+        """
+        for name in ["monotonic", "monotonic_ns", "sleep"]:
+            self._originals[name] = getattr(time, name)
+            setattr(time, name, getattr(self, name))
+
+    def uninstall(self):
+        for name, original in self._originals.items():
+            setattr(time, name, original)
+        self._originals = {}
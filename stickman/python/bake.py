@@ -0,0 +1,102 @@
+"""
+Bake one full loop of every color mode into a binary frame file, see model/frame_file.py
+"""
+
+import argparse
+from typing import Iterator, Optional
+
+from model.body import make_body
+from model.body_group import BodyGroup
+from model.color_memo import ColorMemo
+from model.color_modes import make_color_modes
+from model.frame_file import FrameFile, write_frame_file
+from model.parallel_render import ParallelRenderer
+from model.render_engine import LOOP_TIME_MS, RenderEngine
+
+DEFAULT_FPS = 30
+
+
+def _frames(
+    render_engine: RenderEngine,
+    body_group: BodyGroup,
+    frame_count: int,
+    workers: Optional[int],
+) -> Iterator[bytes]:
+    # Generators run lazily, so the body group is only applied once this mode is written
+    render_engine.set_body_group(body_group)
+    if not workers:
+        for i in range(frame_count):
+            yield bytes(render_engine.render(i / frame_count).pixels)
+        return
+
+    parallel_renderer = ParallelRenderer(render_engine.body, workers)
+    try:
+        for framebuffer in parallel_renderer.render_frames(frame_count):
+            yield bytes(framebuffer.pixels)
+    finally:
+        parallel_renderer.close()
+
+
+def compare(path: str, other_path: str):
+    """
+    Print how many frames differ per mode between two baked files
+    """
+    baked = FrameFile(path)
+    other = FrameFile(other_path)
+    # Frames are only comparable when both files were baked with the same timing and layout
+    for field in ["fps", "frame_count", "lengths"]:
+        if getattr(baked, field) != getattr(other, field):
+            print(
+                f"{field} differs: {getattr(baked, field)} in {path}, "
+                f"{getattr(other, field)} in {other_path}"
+            )
+            baked.close()
+            other.close()
+            return
+
+    for mode in baked.modes:
+        if mode not in other.modes:
+            print(f"{mode}: missing from {other_path}")
+            continue
+
+        different = sum(
+            baked.frame(mode, i) != other.frame(mode, i)
+            for i in range(baked.frame_count)
+        )
+        print(f"{mode}: {different}/{baked.frame_count} frames differ")
+    baked.close()
+    other.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS)
+    parser.add_argument("--output", default="animations.ledf")
+    parser.add_argument("--compare", help="previously baked file to diff against")
+    parser.add_argument(
+        "--workers", type=int, help="render frame ranges on this many processes"
+    )
+    args = parser.parse_args()
+
+    color_modes = make_color_modes(ColorMemo())
+    render_engine = RenderEngine(make_body(0, 0))
+    frame_count = round(LOOP_TIME_MS * args.fps / 1000)
+
+    lengths = {name: strip.length for name, strip in render_engine.body.strips.items()}
+    write_frame_file(
+        args.output,
+        args.fps,
+        frame_count,
+        lengths,
+        {
+            name: _frames(render_engine, body_group, frame_count, args.workers)
+            for name, body_group in color_modes.items()
+        },
+    )
+
+    if args.compare:
+        compare(args.output, args.compare)
+
+
+if __name__ == "__main__":
+    main()
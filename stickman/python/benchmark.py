@@ -0,0 +1,288 @@
+"""
+Benchmark the color algorithms, the memo and full body frames headless, results are printed as JSON
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tracemalloc
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
+
+from model.body import LEG_LED_COUNT, make_body
+from model.color_algorithm import (
+    ColorAlgorithm,
+    PaletteAlgorithm,
+    PastelRGB,
+    PurpleGreenOrangeComet,
+    RainbowRGB,
+    Yoyo,
+)
+from model.color_memo import ColorMemo
+from model.color_modes import FIRE_PALETTE, make_color_modes
+from model.led import LEDStrip
+from model.render_engine import RenderEngine
+from model.scene import Scene, Transform
+from output.hex_color_cache import HexColorCache
+from output.tk_canvas import TkCanvasOutput
+
+# Strip lengths go from a real leg up to 10k LEDs, body scales from the real costume to ~10k LEDs
+STRIP_LENGTHS = [LEG_LED_COUNT, 500, 2000, 10000]
+BODY_SCALES = [1, 4, 10, 40]
+# Scenes of many stick figures, the largest is over 50k LEDs
+SCENE_BODY_COUNTS = [1, 10, 50, 200]
+DEFAULT_FRAMES = 30
+ALLOCATION_FRAMES = 5
+
+ALGORITHMS: Dict[str, Callable[[ColorMemo], ColorAlgorithm]] = {
+    "RainbowRGB": lambda memo: RainbowRGB(0.2, memo, scale=3.0),
+    "PastelRGB": lambda memo: PastelRGB(0.2, memo, scale=3.0, reverse=True),
+    "Comet": lambda memo: PurpleGreenOrangeComet(0.25, memo, scale=8),
+    "Palette": lambda memo: PaletteAlgorithm(0.2, memo, FIRE_PALETTE, scale=3.0),
+    "Yoyo": lambda _: Yoyo(0),
+}
+
+
+class StubTk:
+    def eval(self, script: str) -> str:
+        return ""
+
+
+class StubCanvas:
+    """
+    Accepts the calls TkCanvasOutput makes without a display
+    """
+
+    def __init__(self):
+        self.tk = StubTk()
+        self._item_count = 0
+
+    def create_oval(self, *args, **kwargs) -> int:
+        self._item_count += 1
+        return self._item_count
+
+    def __str__(self) -> str:
+        return ".stub"
+
+
+def _measure(
+    frame: Callable[[float], None],
+    frames: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, float]:
+    """
+    Time `frames` frames, then trace the allocations of a few more. setup runs untimed before each
+    """
+    timings = []
+    for i in range(frames):
+        if setup:
+            setup()
+        start = perf_counter_ns()
+        frame(i / frames)
+        timings.append(perf_counter_ns() - start)
+
+    peaks = []
+    retained = []
+    for i in range(ALLOCATION_FRAMES):
+        if setup:
+            setup()
+        tracemalloc.start()
+        frame(i / ALLOCATION_FRAMES)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+        retained.append(current)
+
+    timings.sort()
+    return {
+        "frames": frames,
+        "mean_ns": statistics.mean(timings),
+        "min_ns": timings[0],
+        "p95_ns": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "peak_alloc_bytes": statistics.mean(peaks),
+        "retained_alloc_bytes": statistics.mean(retained),
+    }
+
+
+def _make_strip(length: int, color_algorithm: ColorAlgorithm) -> LEDStrip:
+    led_strip = LEDStrip()
+    for i in range(length):
+        led_strip.add_led(i, 0, 0, 0, 0)
+    led_strip.set_color_algorithm(color_algorithm)
+    return led_strip
+
+
+def bench_algorithms(frames: int) -> List[Dict]:
+    """
+    Per-LED ColorAlgorithm.evaluate against the batched LEDStrip.render, cold and warm memo
+    """
+    results = []
+    for name, make_algorithm in ALGORITHMS.items():
+        for length in STRIP_LENGTHS:
+            for memo_state in ["cold", "warm"]:
+                state = {}
+
+                def setup():
+                    algorithm = make_algorithm(ColorMemo())
+                    state["algorithm"] = algorithm
+                    state["strip"] = _make_strip(length, algorithm)
+
+                def evaluate(ratio: float):
+                    algorithm = state["algorithm"]
+                    signed_length = length if algorithm.is_reverse() else -1 * length
+                    for idx in range(length):
+                        if algorithm.is_linear():
+                            percent = ratio + idx / (signed_length * algorithm.scale)
+                        else:
+                            percent = ratio * algorithm.scale
+                        algorithm.evaluate(percent, idx, length)
+
+                def render(ratio: float):
+                    state["strip"].render(ratio)
+
+                for benchmark, frame in [
+                    ("evaluate", evaluate),
+                    ("strip_render", render),
+                ]:
+                    if memo_state == "warm":
+                        setup()
+                        state["algorithm"].precompute(length)
+                        measurement = _measure(frame, frames)
+                    else:
+                        measurement = _measure(frame, frames, setup)
+
+                    results.append(
+                        {
+                            "benchmark": benchmark,
+                            "subject": name,
+                            "leds": length,
+                            "memo": memo_state,
+                            **measurement,
+                        }
+                    )
+    return results
+
+
+def bench_body(frames: int) -> List[Dict]:
+    """
+    Full six strip body frames for every color mode, pushed through a stub canvas
+    """
+    results = []
+    for led_scale in BODY_SCALES:
+        canvas_output = TkCanvasOutput(StubCanvas(), HexColorCache())
+        render_engine = RenderEngine(make_body(0, 0, led_scale), [canvas_output])
+        led_count = sum(strip.length for strip in render_engine.body.strips.values())
+        mode_names = list(make_color_modes(ColorMemo()).keys())
+
+        for mode in mode_names:
+            for memo_state in ["cold", "warm"]:
+                # The color cache lives as long as the canvas, count only this run's lookups
+                color_cache = canvas_output.color_cache
+                cache_hits, cache_misses = color_cache.hits, color_cache.misses
+
+                def setup():
+                    render_engine.set_body_group(make_color_modes(ColorMemo())[mode])
+
+                def frame(ratio: float):
+                    render_engine.update(ratio)
+
+                if memo_state == "warm":
+                    body_group = make_color_modes(ColorMemo())[mode]
+                    render_engine.set_body_group(body_group)
+                    body_group.precompute(render_engine.body)
+                    measurement = _measure(frame, frames)
+                else:
+                    measurement = _measure(frame, frames, setup)
+
+                results.append(
+                    {
+                        "benchmark": "body_frame",
+                        "subject": mode,
+                        "leds": led_count,
+                        "memo": memo_state,
+                        "color_cache_hits": color_cache.hits - cache_hits,
+                        "color_cache_misses": color_cache.misses - cache_misses,
+                        **measurement,
+                    }
+                )
+    return results
+
+
+def bench_scene(frames: int) -> List[Dict]:
+    """
+    Scenes of many bodies sharing one memo, every body in a different color mode.
+
+    With shared algorithms every body in a mode reuses the same instances, so the render engine
+    computes each distinct strip once and copies it to the others. With per_body algorithms
+    every body gets its own instances and every strip is computed, which is how a scene scales.
+    """
+    results = []
+    for body_count in SCENE_BODY_COUNTS:
+        for algorithms in ["shared", "per_body"]:
+            scene = Scene()
+            color_memo = ColorMemo()
+            mode_names = list(make_color_modes(color_memo))
+            shared_modes = make_color_modes(color_memo)
+            body = make_body(0, 0)
+            for i in range(body_count):
+                # Instances of the same mode still share their tables through the memo
+                color_modes = (
+                    shared_modes
+                    if algorithms == "shared"
+                    else make_color_modes(color_memo)
+                )
+                body_group = color_modes[mode_names[i % len(mode_names)]]
+                body_group.precompute(body)
+                scene.add_body(
+                    f"body_{i}",
+                    body,
+                    body_group,
+                    Transform(dx=(i % 20) * 100, dy=(i // 20) * 200, scale=0.2),
+                )
+
+            render_engine = RenderEngine(scene)
+            measurement = _measure(render_engine.render, frames)
+            results.append(
+                {
+                    "benchmark": "scene_frame",
+                    "subject": f"{body_count}_bodies",
+                    "algorithms": algorithms,
+                    "leds": scene.led_count,
+                    "memo": "warm",
+                    **measurement,
+                }
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument(
+        "--output", help="write the JSON results here instead of stdout"
+    )
+    parser.add_argument(
+        "--only",
+        choices=["algorithms", "body", "scene"],
+        help="run a single group of benchmarks",
+    )
+    args = parser.parse_args()
+
+    results = []
+    if args.only in [None, "algorithms"]:
+        results += bench_algorithms(args.frames)
+    if args.only in [None, "body"]:
+        results += bench_body(args.frames)
+    if args.only in [None, "scene"]:
+        results += bench_scene(args.frames)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Stream color modes through a network or serial output to a receiver on this machine, and check
+that whole frames arrive at the target rate. Serial runs over a pseudo-terminal. Results are
+printed as JSON
+"""
+
+import argparse
+import json
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Union
+
+from model.body import make_body
+from model.color_memo import ColorMemo
+from model.color_modes import make_color_modes
+from model.render_engine import LOOP_TIME_MS, RenderEngine
+from output.network import (
+    E131_HEADER_BYTES,
+    E131_LEDS_PER_UNIVERSE,
+    OPC_HEADER,
+    E131Output,
+    NetworkOutput,
+    OpcOutput,
+)
+from output.serial_link import (
+    ACK,
+    CHECKSUM,
+    FRAME_HEADER,
+    MAGIC,
+    NAK,
+    STRIP_LENGTH,
+    SerialOutput,
+)
+
+DEFAULT_HZ = 30
+DEFAULT_SECONDS = 5
+DEFAULT_LED_SCALE = 40
+RECEIVE_BUFFER_BYTES = 8 * 1024 * 1024
+
+
+class LoopbackReceiver:
+    """
+    Counts complete and incomplete frames, a frame is complete when every expected channel or
+    universe arrived with the right amount of LED data
+    """
+
+    def __init__(self):
+        # Channel or universe to its LED data length in bytes
+        self._expected: Dict[int, int] = {}
+        self._received: Dict[int, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.complete_frames = 0
+        self.incomplete_frames = 0
+        self.bytes_received = 0
+
+    def expect(self, expected: Dict[int, int]):
+        self._expected = expected
+
+    def _end_frame(self):
+        if not self._received:
+            return
+        if self._received == self._expected:
+            self.complete_frames += 1
+        else:
+            self.incomplete_frames += 1
+        self._received = {}
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self._end_frame()
+
+
+class OpcReceiver(LoopbackReceiver):
+    def __init__(self):
+        super().__init__()
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    def _receive(self):
+        connection, _ = self._server.accept()
+        connection.settimeout(0.1)
+        buffer = bytearray()
+        while True:
+            try:
+                data = connection.recv(1 << 20)
+            except socket.timeout:
+                if self._stopped.is_set():
+                    break
+                continue
+            if not data:
+                break
+            self.bytes_received += len(data)
+            buffer += data
+
+            position = 0
+            while len(buffer) - position >= OPC_HEADER.size:
+                channel, _, length = OPC_HEADER.unpack_from(buffer, position)
+                if len(buffer) - position < OPC_HEADER.size + length:
+                    break
+                # Frames always start from the first channel
+                if channel == min(self._expected):
+                    self._end_frame()
+                self._received[channel] = length
+                position += OPC_HEADER.size + length
+            del buffer[:position]
+        connection.close()
+        self._server.close()
+
+
+class E131Receiver(LoopbackReceiver):
+    def __init__(self):
+        super().__init__()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES
+        )
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.settimeout(0.1)
+        self._sequence: Optional[int] = None
+        self.port = self._socket.getsockname()[1]
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    def _receive(self):
+        while not self._stopped.is_set():
+            try:
+                packet = self._socket.recv(1024)
+            except socket.timeout:
+                continue
+            self.bytes_received += len(packet)
+
+            sequence = packet[111]
+            (universe,) = struct.unpack_from(">H", packet, 113)
+            # Every universe of a frame carries the same sequence number
+            if sequence != self._sequence:
+                self._end_frame()
+                self._sequence = sequence
+            self._received[universe] = len(packet) - E131_HEADER_BYTES
+        self._socket.close()
+
+
+class SerialReceiver(LoopbackReceiver):
+    """
+    Plays the LED controller on the far end of a pseudo-terminal. It takes `show_s` to show a
+    frame before acknowledging it, like the strips themselves.
+    """
+
+    def __init__(self, show_s: float = 0.0):
+        super().__init__()
+        self._show_s = show_s
+        self._master, slave = os.openpty()
+        self.device = os.ttyname(slave)
+        # Keep the slave open so the terminal survives the output reopening it
+        self._slave = slave
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    def _receive(self):
+        buffer = bytearray()
+        while not self._stopped.is_set():
+            readable, _, _ = select.select([self._master], [], [], 0.1)
+            if not readable:
+                continue
+            data = os.read(self._master, 1 << 16)
+            self.bytes_received += len(data)
+            buffer += data
+
+            while True:
+                frame_length = self._frame_length(buffer)
+                if frame_length is None or len(buffer) < frame_length:
+                    break
+                self._receive_frame(bytes(buffer[:frame_length]))
+                del buffer[:frame_length]
+        os.close(self._master)
+        os.close(self._slave)
+
+    def _frame_length(self, buffer: bytearray) -> Optional[int]:
+        # Drop anything before the next magic, e.g. after a corrupted frame
+        start = buffer.find(MAGIC)
+        if start < 0:
+            del buffer[: max(0, len(buffer) - len(MAGIC) + 1)]
+            return None
+        del buffer[:start]
+        if len(buffer) < FRAME_HEADER.size:
+            return None
+
+        _, _, strip_count = FRAME_HEADER.unpack_from(buffer)
+        header_length = FRAME_HEADER.size + strip_count * STRIP_LENGTH.size
+        if len(buffer) < header_length:
+            return None
+        led_count = sum(
+            STRIP_LENGTH.unpack_from(buffer, FRAME_HEADER.size + i * STRIP_LENGTH.size)[
+                0
+            ]
+            for i in range(strip_count)
+        )
+        return header_length + led_count * 3 + CHECKSUM.size
+
+    def _receive_frame(self, frame: bytes):
+        checksum_start = len(frame) - CHECKSUM.size
+        (checksum,) = CHECKSUM.unpack_from(frame, checksum_start)
+        if zlib.crc32(frame[len(MAGIC) : checksum_start]) != checksum:
+            self.incomplete_frames += 1
+            os.write(self._master, bytes([NAK]))
+            return
+
+        _, _, strip_count = FRAME_HEADER.unpack_from(frame)
+        for i in range(strip_count):
+            (length,) = STRIP_LENGTH.unpack_from(
+                frame, FRAME_HEADER.size + i * STRIP_LENGTH.size
+            )
+            self._received[i] = length * 3
+        self._end_frame()
+
+        if self._show_s:
+            time.sleep(self._show_s)
+        os.write(self._master, bytes([ACK]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--protocol", choices=["opc", "e131", "serial"], default="opc")
+    parser.add_argument("--hz", type=float, default=DEFAULT_HZ)
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS)
+    parser.add_argument(
+        "--led-scale",
+        type=float,
+        default=DEFAULT_LED_SCALE,
+        help="LEDs per strip relative to the real costume",
+    )
+    parser.add_argument("--mode", default="rainbow")
+    parser.add_argument(
+        "--device-hz",
+        type=float,
+        help="serial only, how many frames a second the simulated controller can show",
+    )
+    parser.add_argument("--baudrate", type=int, default=12000000, help="serial only")
+    args = parser.parse_args()
+
+    body = make_body(0, 0, args.led_scale)
+    lengths = {name: strip.length for name, strip in body.strips.items()}
+    receiver: LoopbackReceiver
+    output: Union[NetworkOutput, SerialOutput]
+    if args.protocol == "opc":
+        receiver = OpcReceiver()
+        output = OpcOutput("127.0.0.1", receiver.port)
+    elif args.protocol == "serial":
+        receiver = SerialReceiver(1 / args.device_hz if args.device_hz else 0.0)
+        output = SerialOutput(receiver.device, args.baudrate)
+    else:
+        receiver = E131Receiver()
+        output = E131Output("127.0.0.1", receiver.port)
+
+    # The output assigns channels and universes when it is opened
+    render_engine = RenderEngine(body, [output])
+    expected = {}
+    if isinstance(output, OpcOutput):
+        for name, channel in output.channels.items():
+            expected[channel] = lengths[name] * 3
+    elif isinstance(output, SerialOutput):
+        for i, length in enumerate(lengths.values()):
+            expected[i] = length * 3
+    else:
+        for name, universes in output.universes.items():
+            for i, universe in enumerate(universes):
+                first_led = i * E131_LEDS_PER_UNIVERSE
+                expected[universe] = (
+                    min(E131_LEDS_PER_UNIVERSE, lengths[name] - first_led) * 3
+                )
+    receiver.expect(expected)
+    body_group = make_color_modes(ColorMemo())[args.mode]
+    render_engine.set_body_group(body_group)
+    body_group.precompute(body)
+
+    # Frames go out on absolute deadlines, like the Tk loop
+    frame_count = int(args.hz * args.seconds)
+    period_s = 1 / args.hz
+    start_s = time.perf_counter()
+    for frame in range(frame_count):
+        render_engine.update((frame * period_s * 1000 % LOOP_TIME_MS) / LOOP_TIME_MS)
+        delay_s = start_s + (frame + 1) * period_s - time.perf_counter()
+        if delay_s > 0:
+            time.sleep(delay_s)
+    elapsed_s = time.perf_counter() - start_s
+
+    results = {
+        "protocol": args.protocol,
+        "leds": sum(lengths.values()),
+        "packets_per_frame": len(expected),
+        "target_hz": args.hz,
+        "achieved_hz": frame_count / elapsed_s,
+        "frames_sent": output.frames_sent,
+        "frames_dropped": output.frames_dropped,
+    }
+    if isinstance(output, SerialOutput):
+        results["link_utilization"] = output.utilization
+
+    time.sleep(0.2)
+    render_engine.close()
+    receiver.stop()
+
+    results["frames_complete"] = receiver.complete_frames
+    results["frames_incomplete"] = receiver.incomplete_frames
+    results["mbit_per_s"] = receiver.bytes_received * 8 / elapsed_s / 1e6
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
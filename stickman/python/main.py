@@ -1,22 +1,30 @@
+import argparse
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
 from time import time_ns
-from tkinter import Canvas, Tk
-from typing import List
+from tkinter import Canvas, TclError, Tk
+from typing import List, Optional
 
-from model.body import TORSO_LED_COUNT, Body
+from model.body import make_body
 from model.body_group import BodyGroup
-from model.color_algorithm import (
-    ColorAlgorithm,
-    PastelRGB,
-    PurpleGreenOrangeComet,
-    RainbowRGB,
-    Yoyo,
-)
 from model.color_memo import ColorMemo
-from model.point2d import Point2D
+from model.color_modes import make_color_modes
+from model.frame_scheduler import FrameScheduler
+from model.frame_stats import FrameStats
+from model.render_engine import LOOP_TIME_MS, RenderEngine
+from model.render_pipeline import PipelineFrame, RenderPipeline, SinkStage
+from output.output import Output
+from output.tk_canvas import TkCanvasOutput
+from output.tk_image import TkImageOutput
 
 CANVAS_WIDTH = 500
 CANVAS_HEIGHT = 700
 REFRESH_HZ = 30
+COLOR_MEMO_MAX_BYTES = 16 * 1024 * 1024
+# Ovals are one canvas item per LED, image rasterizes every LED into a single PhotoImage
+CANVAS_OUTPUTS = ["ovals", "image"]
+# How often the pipeline lets tkinter handle its events
+TK_POLL_S = 0.005
 
 
 def time_ms() -> int:
@@ -24,7 +32,13 @@ def time_ms() -> int:
 
 
 class Main:
-    def __init__(self):
+    def __init__(
+        self,
+        refresh_hz: float = REFRESH_HZ,
+        trace_path: Optional[str] = None,
+        canvas_output: str = "ovals",
+        pipeline: bool = False,
+    ):
         self.root = Tk()
         self.root.geometry(f"{CANVAS_WIDTH}x{CANVAS_HEIGHT}+100+100")
         self.my_canvas = Canvas(
@@ -32,89 +46,26 @@ class Main:
         )
 
         # GUI
-        leg_root = Point2D(CANVAS_WIDTH / 2, CANVAS_HEIGHT * 0.55)
-        torso_top = Point2D(leg_root.x, leg_root.y - TORSO_LED_COUNT * 6)
-        arm_root = torso_top + (leg_root - torso_top) * 0.3
-        self.body = Body(self.my_canvas, leg_root, torso_top, arm_root)
+        self.body = make_body(CANVAS_WIDTH, CANVAS_HEIGHT)
+        self.trace_path = trace_path
+        self.frame_stats = FrameStats(refresh_hz, keep_trace=trace_path is not None)
+        self.canvas_output = self._make_canvas_output(canvas_output)
+        # The pipeline feeds the canvas itself, from its own sink stage
+        self.render_engine = RenderEngine(
+            self.body, [] if pipeline else [self.canvas_output], self.frame_stats
+        )
 
         # Add a memo pad for precomputed color result lookup
-        color_memo = ColorMemo()
+        color_memo = ColorMemo(max_bytes=COLOR_MEMO_MAX_BYTES)
 
         # Coloring algorithms
-        rainbow_rgb_no_offset = RainbowRGB(0, color_memo)
-        rainbow_rgb_arm_reverse = RainbowRGB(2 / 3, color_memo, reverse=True)
-        rainbow_rgb_reverse_no_offset = RainbowRGB(0, color_memo, reverse=True)
-
-        rainbow_rgb_scale3 = RainbowRGB(0, color_memo, scale=3.0)
-        rainbow_rgb_scale3_reverse = RainbowRGB(0, color_memo, scale=3.0, reverse=True)
-        rainbow_rgb_scale3_arm_reverse = RainbowRGB(
-            0.2, color_memo, scale=3.0, reverse=True
-        )
-
-        pastel_rgb_1_values = []  # default settings
-        pastel_rgb_2_values = [50, 105, 110, 145, 80, 145]
-        pastel_rgb_3_values = [10, 105, 110, 145, 40, 145]
-
-        def _pastel_body(rgb_config: List[int]) -> List[ColorAlgorithm]:
-            """
-            Takes a list of pastel config values and outputs the color algorithms for a pastel body
-            """
-            return [
-                PastelRGB(0, color_memo, *rgb_config, scale=1.0),
-                PastelRGB(0, color_memo, *rgb_config, scale=3.0, reverse=True),
-                PastelRGB(0.2, color_memo, *rgb_config, scale=3.0, reverse=True),
-                PastelRGB(0.2, color_memo, *rgb_config, scale=3.0, reverse=True),
-                PastelRGB(0, color_memo, *rgb_config, scale=3.0),
-                PastelRGB(0, color_memo, *rgb_config, scale=3.0),
-            ]
-
-        self.color_modes = {
-            "rainbow": BodyGroup(
-                rainbow_rgb_no_offset,
-                rainbow_rgb_reverse_no_offset,
-                rainbow_rgb_arm_reverse,
-                rainbow_rgb_arm_reverse,
-                rainbow_rgb_no_offset,
-                rainbow_rgb_no_offset,
-            ),
-            "rainbow_long": BodyGroup(
-                rainbow_rgb_no_offset,
-                rainbow_rgb_scale3_reverse,
-                rainbow_rgb_scale3_arm_reverse,
-                rainbow_rgb_scale3_arm_reverse,
-                rainbow_rgb_scale3,
-                rainbow_rgb_scale3,
-            ),
-            "pastel_rgb": BodyGroup(*_pastel_body(pastel_rgb_1_values)),
-            "pastel_rgb_2": BodyGroup(*_pastel_body(pastel_rgb_2_values)),
-            "pastel_rgb_3": BodyGroup(*_pastel_body(pastel_rgb_3_values)),
-            "pgo_comet": BodyGroup(
-                PurpleGreenOrangeComet(0, color_memo),
-                PurpleGreenOrangeComet(0, color_memo, reverse=True),
-                PurpleGreenOrangeComet(2 / 3, color_memo, reverse=True),
-                PurpleGreenOrangeComet(2 / 3, color_memo, reverse=True),
-                PurpleGreenOrangeComet(0, color_memo),
-                PurpleGreenOrangeComet(0, color_memo),
-            ),
-            "pgo_comet_in_to_out": BodyGroup(
-                PurpleGreenOrangeComet(0, color_memo),
-                PurpleGreenOrangeComet(0, color_memo, scale=8),
-                PurpleGreenOrangeComet(1 / 4, color_memo, scale=8),
-                PurpleGreenOrangeComet(1 / 4, color_memo, scale=8),
-                PurpleGreenOrangeComet(3 / 4, color_memo, scale=8),
-                PurpleGreenOrangeComet(3 / 4, color_memo, scale=8),
-            ),
-            "yoyo": BodyGroup(
-                Yoyo(0, color_memo),
-                Yoyo(0, color_memo),
-                Yoyo(0, color_memo),
-                Yoyo(0, color_memo),
-                Yoyo(0, color_memo),
-                Yoyo(0, color_memo),
-            ),
-        }
+        self.color_modes = make_color_modes(color_memo)
         self.color_memo = color_memo
 
+        # Bake color tables on a worker thread so switching modes never stalls update_leds
+        self._precompute_executor = ThreadPoolExecutor(max_workers=1)
+        self._precompute_futures: List[Future] = []
+
         self.color_mode = "yoyo"
         self.ratio_text = self.my_canvas.create_text(
             CANVAS_WIDTH / 2, 10, text="Ratio: 0%", fill="white", justify="left"
@@ -134,8 +85,13 @@ class Main:
             fill="white",
             justify="left",
         )
+        self.stats_text = self.my_canvas.create_text(
+            CANVAS_WIDTH / 2, 70, text="FPS: 0", fill="white", justify="left"
+        )
 
         self._set_color_mode(self.color_mode)
+        for body_group in self.color_modes.values():
+            self._precompute(body_group)
 
         self.root.bind("<Right>", lambda e: self.rightKeyPress(e))
         self.root.bind("<Left>", lambda e: self.leftKeyPress(e))
@@ -143,31 +99,89 @@ class Main:
         self.root.bind("<Down>", lambda e: self.downKeyPress(e))
         self.root.bind("<Escape>", lambda e: self.escapeKeyPress(e))
 
-        self.start_time_ms = time_ms()
         self.my_canvas.pack()
+        if pipeline:
+            asyncio.run(self._run_pipeline(refresh_hz))
+            return
+
+        self.start_time_ms = time_ms()
+        self.frame_scheduler = FrameScheduler(
+            refresh_hz, self.start_time_ms, time_ms, self.frame_stats
+        )
         self.update_leds()
 
         self.root.mainloop()
 
+    def _make_canvas_output(self, canvas_output: str) -> Output:
+        if canvas_output == "image":
+            return TkImageOutput(self.my_canvas, CANVAS_WIDTH, CANVAS_HEIGHT)
+        return TkCanvasOutput(self.my_canvas)
+
     def update_leds(self):
-        time_diff = time_ms() - self.start_time_ms
-        LOOP_TIME_MS = 2000
+        time_diff = self.frame_scheduler.frame_time_ms() - self.start_time_ms
         percent_through_loop = (time_diff % LOOP_TIME_MS) / LOOP_TIME_MS
 
-        self.body.right_leg.update(percent_through_loop)
-        self.body.left_leg.update(percent_through_loop)
-        self.body.torso.update(percent_through_loop)
-        self.body.head.update(percent_through_loop)
-        self.body.left_arm.update(percent_through_loop)
-        self.body.right_arm.update(percent_through_loop)
-
+        self.render_engine.update(percent_through_loop)
+        self._update_overlay(percent_through_loop)
+
+        self.root.after(self.frame_scheduler.next_delay_ms(), self.update_leds)
+
+    async def _run_pipeline(self, refresh_hz: float):
+        """
+        Render ahead on the asyncio pipeline, with tkinter pumped from the same event loop
+        """
+        pipeline = RenderPipeline(self.render_engine, refresh_hz)
+        # tkinter may only be called from the thread that created it
+        pipeline.add_sink(self.canvas_output, in_thread=False)
+
+        def on_sink_error(_: SinkStage, error: Exception):
+            # Escape destroys the canvas, a frame already on its way then fails to draw
+            if isinstance(error, TclError):
+                pipeline.stop()
+
+        pump = asyncio.ensure_future(self._pump_tk(pipeline))
+        try:
+            await pipeline.run(
+                on_frame=self._show_pipeline_frame, on_error=on_sink_error
+            )
+        finally:
+            pump.cancel()
+            pipeline.close()
+
+    async def _pump_tk(self, pipeline: RenderPipeline):
+        try:
+            while True:
+                self.root.update()
+                await asyncio.sleep(TK_POLL_S)
+        except TclError:
+            # The window was closed
+            pipeline.stop()
+
+    def _show_pipeline_frame(self, frame: PipelineFrame):
+        try:
+            self._update_overlay(frame.ratio)
+        except TclError:
+            # The window closed while the frame was on its way
+            pass
+
+    def _update_overlay(self, percent_through_loop: float):
         self.my_canvas.itemconfig(
             self.ratio_text, text=f"Percent: {round(percent_through_loop * 100, 1)}%"
         )
-
-        self.root.after(int(1000 / REFRESH_HZ), self.update_leds)
+        stats = self.frame_stats.summary()
+        if isinstance(self.canvas_output, TkCanvasOutput):
+            stats += (
+                f" | color cache: {self.canvas_output.color_cache.hit_rate:.1%} hits"
+            )
+        self.my_canvas.itemconfig(self.stats_text, text=stats)
 
     def escapeKeyPress(self, _):
+        # shutdown(cancel_futures=True) needs Python 3.9
+        for future in self._precompute_futures:
+            future.cancel()
+        self._precompute_executor.shutdown(wait=False)
+        if self.trace_path:
+            self.frame_stats.dump(self.trace_path)
         self.root.destroy()
 
     def leftKeyPress(self, _):
@@ -196,32 +210,57 @@ class Main:
         self.color_mode = color_mode
         body_group: BodyGroup = self.color_modes[color_mode]
 
-        self.body.head.set_color_algorithm(body_group.head)
-        self.body.torso.set_color_algorithm(body_group.torso)
-        self.body.right_arm.set_color_algorithm(body_group.right_arm)
-        self.body.left_arm.set_color_algorithm(body_group.left_arm)
-        self.body.right_leg.set_color_algorithm(body_group.right_leg)
-        self.body.left_leg.set_color_algorithm(body_group.left_leg)
+        self.render_engine.set_body_group(body_group)
+        self._precompute(body_group)
 
         self.my_canvas.itemconfig(self.mode_text, text=f"Mode: {self.color_mode}")
 
     def _set_adjustment_level(self, adjustment_level: int):
         self.adjustment_level = adjustment_level
 
-        self.body.head._color_algorithm.set_adjustment_level(self.adjustment_level)
-        self.body.torso._color_algorithm.set_adjustment_level(self.adjustment_level)
-        self.body.right_arm._color_algorithm.set_adjustment_level(self.adjustment_level)
-        self.body.left_arm._color_algorithm.set_adjustment_level(self.adjustment_level)
-        self.body.right_leg._color_algorithm.set_adjustment_level(self.adjustment_level)
-        self.body.left_leg._color_algorithm.set_adjustment_level(self.adjustment_level)
+        self.render_engine.set_adjustment_level(self.adjustment_level)
+        self._precompute(self.color_modes[self.color_mode])
 
         self.my_canvas.itemconfig(
             self.adjustment_text, text=f"Adjustment: {self.adjustment_level}"
         )
 
+    def _precompute(self, body_group: BodyGroup):
+        self._precompute_futures = [
+            future for future in self._precompute_futures if not future.done()
+        ]
+        self._precompute_futures.append(
+            self._precompute_executor.submit(body_group.precompute, self.body)
+        )
+
 
 def main():
-    Main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--trace", help="dump frame timings to this .csv or .json file on exit"
+    )
+    parser.add_argument(
+        "--hz", type=float, default=REFRESH_HZ, help="target refresh rate"
+    )
+    parser.add_argument(
+        "--canvas",
+        choices=CANVAS_OUTPUTS,
+        default="ovals",
+        help="how LEDs are drawn on the canvas",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="render ahead on an asyncio pipeline instead of in the Tk loop",
+    )
+    args = parser.parse_args()
+
+    Main(
+        refresh_hz=args.hz,
+        trace_path=args.trace,
+        canvas_output=args.canvas,
+        pipeline=args.pipeline,
+    )
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 import math
-from tkinter import Canvas
+from typing import Dict
 
-from model.led import LED, LEDStrip
+from model.led import LEDStrip
 from model.point2d import Point2D
 
 X_DISTANCE = 6
@@ -12,6 +12,9 @@ HEAD_LED_COUNT = 50
 HEAD_RADIUS = 60
 ARM_LED_COUNT = 40
 
+# Strip order shared by frame buffers and output backends
+STRIP_NAMES = ["head", "torso", "left_arm", "right_arm", "left_leg", "right_leg"]
+
 
 class Body:
     head: LEDStrip
@@ -22,12 +25,17 @@ class Body:
     right_leg: LEDStrip
 
     def __init__(
-        self, canvas: Canvas, leg_root: Point2D, torso_top: Point2D, arm_root: Point2D
+        self,
+        leg_root: Point2D,
+        torso_top: Point2D,
+        arm_root: Point2D,
+        led_scale: float = 1.0,
     ):
-        self._canvas = canvas
         self._leg_root = leg_root
         self._arm_root = arm_root
         self._torso_top = torso_top
+        # Multiplies every strip's LED count, spacing shrinks so the figure keeps its size
+        self._led_scale = led_scale
 
         # Make LED strips in a person-shape
         self.right_leg = self._make_right_leg()
@@ -37,55 +45,73 @@ class Body:
         self.right_arm = self._make_right_arm()
         self.left_arm = self._make_left_arm()
 
+    @property
+    def strips(self) -> Dict[str, LEDStrip]:
+        return {name: getattr(self, name) for name in STRIP_NAMES}
+
+    def _count(self, led_count: int) -> int:
+        return max(1, round(led_count * self._led_scale))
+
     def _make_right_leg(self) -> LEDStrip:
         led_strip = LEDStrip()
-        for i in range(0, LEG_LED_COUNT):
-            x = self._leg_root.x + 1 * i
-            y = self._leg_root.y + Y_DISTANCE * i
-            led_strip.add_led(LED(x, y, 255, 0, 255, self._canvas))
+        for i in range(0, self._count(LEG_LED_COUNT)):
+            x = self._leg_root.x + 1 * i / self._led_scale
+            y = self._leg_root.y + Y_DISTANCE * i / self._led_scale
+            led_strip.add_led(x, y, 255, 0, 255)
         return led_strip
 
     def _make_left_leg(self) -> LEDStrip:
         led_strip = LEDStrip()
-        for i in range(0, LEG_LED_COUNT):
-            x = self._leg_root.x - 1 * i
-            y = self._leg_root.y + Y_DISTANCE * i
-            led_strip.add_led(LED(x, y, 128, 0, 128, self._canvas))
+        for i in range(0, self._count(LEG_LED_COUNT)):
+            x = self._leg_root.x - 1 * i / self._led_scale
+            y = self._leg_root.y + Y_DISTANCE * i / self._led_scale
+            led_strip.add_led(x, y, 128, 0, 128)
         return led_strip
 
     def _make_torso(self) -> LEDStrip:
         led_strip = LEDStrip()
-        for i in range(0, TORSO_LED_COUNT):
+        for i in range(0, self._count(TORSO_LED_COUNT)):
             x = self._leg_root.x
-            y = self._leg_root.y - Y_DISTANCE * i
-            led_strip.add_led(LED(x, y, 128, 0, 128, self._canvas))
+            y = self._leg_root.y - Y_DISTANCE * i / self._led_scale
+            led_strip.add_led(x, y, 128, 0, 128)
         return led_strip
 
     def _make_head(self) -> LEDStrip:
         led_strip = LEDStrip()
         head_center = self._torso_top + Point2D(0, -1 * HEAD_RADIUS)
 
-        for i in range(0, HEAD_LED_COUNT):
-            angle = (360 / HEAD_LED_COUNT) * i
+        head_led_count = self._count(HEAD_LED_COUNT)
+        for i in range(0, head_led_count):
+            angle = (360 / head_led_count) * i
             radians = 2 * math.pi * angle / 360
 
             x = head_center.x + (math.cos(radians) * HEAD_RADIUS)
             y = head_center.y + (math.sin(radians) * HEAD_RADIUS)
-            led_strip.add_led(LED(x, y, 0, 128, 128, self._canvas))
+            led_strip.add_led(x, y, 0, 128, 128)
         return led_strip
 
     def _make_right_arm(self) -> LEDStrip:
         led_strip = LEDStrip()
-        for i in range(1, ARM_LED_COUNT + 1):
-            x = self._arm_root.x + X_DISTANCE * i
-            y = self._arm_root.y - 2 * i
-            led_strip.add_led(LED(x, y, 128, 0, 128, self._canvas))
+        for i in range(1, self._count(ARM_LED_COUNT) + 1):
+            x = self._arm_root.x + X_DISTANCE * i / self._led_scale
+            y = self._arm_root.y - 2 * i / self._led_scale
+            led_strip.add_led(x, y, 128, 0, 128)
         return led_strip
 
     def _make_left_arm(self) -> LEDStrip:
         led_strip = LEDStrip()
-        for i in range(1, ARM_LED_COUNT + 1):
-            x = self._arm_root.x - X_DISTANCE * i
-            y = self._arm_root.y - 2 * i
-            led_strip.add_led(LED(x, y, 128, 0, 128, self._canvas))
+        for i in range(1, self._count(ARM_LED_COUNT) + 1):
+            x = self._arm_root.x - X_DISTANCE * i / self._led_scale
+            y = self._arm_root.y - 2 * i / self._led_scale
+            led_strip.add_led(x, y, 128, 0, 128)
         return led_strip
+
+
+def make_body(width: float, height: float, led_scale: float = 1.0) -> Body:
+    """
+    Lay out a stick figure centered in a width x height area
+    """
+    leg_root = Point2D(width / 2, height * 0.55)
+    torso_top = Point2D(leg_root.x, leg_root.y - TORSO_LED_COUNT * 6)
+    arm_root = torso_top + (leg_root - torso_top) * 0.3
+    return Body(leg_root, torso_top, arm_root, led_scale)
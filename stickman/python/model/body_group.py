@@ -1,3 +1,4 @@
+from model.body import Body
 from model.color_algorithm import ColorAlgorithm
 
 
@@ -18,6 +19,17 @@ class BodyGroup:
         self._left_leg_algorithm = left_leg_algorithm
         self._right_leg_algorithm = right_leg_algorithm
 
+    def precompute(self, body: Body) -> None:
+        """
+        Fill the color tables of every algorithm for the strips of the body
+        """
+        self._head_algorithm.precompute(body.head.length)
+        self._torso_algorithm.precompute(body.torso.length)
+        self._left_arm_algorithm.precompute(body.left_arm.length)
+        self._right_arm_algorithm.precompute(body.right_arm.length)
+        self._left_leg_algorithm.precompute(body.left_leg.length)
+        self._right_leg_algorithm.precompute(body.right_leg.length)
+
     @property
     def head(self) -> ColorAlgorithm:
         return self._head_algorithm
@@ -1,28 +1,51 @@
 import math
 from abc import ABC, abstractmethod
-from hashlib import sha256
+from typing import Hashable, Tuple
 
-from model.color_memo import ColorMemo
+from model.color_memo import ColorMemo, MemoSlot
+from model.palette import Palette
 from model.rgb import RGB
 
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional, strips fall back to a pure Python gather without it
+    np = None
+
 RGB_SCALAR: int = 192
 RGB_OFFSET: int = 128
 
 
-def hash(val: str) -> str:
-    return sha256(val.encode("utf-8")).hexdigest()
-
-
 class ColorAlgorithm(ABC):
-    lookup_key: str
     num_buckets: int
+    interpolate: bool
     scale: float
     reverse: bool
+    _offset: float
 
     @abstractmethod
     def evaluate(self, percent: float, idx: int, total_leds: int) -> RGB:
         pass
 
+    def evaluate_strip(
+        self, ratio: float, length: int, reverse: bool, scale: float
+    ) -> bytearray:
+        """
+        Render a whole strip in one batch as a contiguous (length x 3) uint8 RGB buffer
+        """
+        percent = ratio * scale
+        frame = bytearray(length * 3)
+        for idx in range(length):
+            rgb = self.evaluate(percent, idx, length)
+            frame[idx * 3 : idx * 3 + 3] = rgb.as_bytes()
+        return frame
+
+    def precompute(self, length: int) -> None:
+        """
+        Fill every bucket up front for a strip of `length` LEDs, so evaluation never misses
+        """
+        pass
+
     @abstractmethod
     def is_linear(self) -> bool:
         # Return if the color algorithm can be represented as a 1D array, purely linear motion
@@ -32,52 +55,183 @@ class ColorAlgorithm(ABC):
         return self.reverse
 
     def get_bucket(self, percent: float) -> int:
-        return math.floor(percent * self.num_buckets)
+        # Wrap around, floating point modulo can land exactly on 1.0
+        return math.floor(percent * self.num_buckets) % self.num_buckets
 
     def set_adjustment_level(self, level: int) -> None:
         pass
 
 
-class RainbowRGB(ColorAlgorithm):
+class LinearColorAlgorithm(ColorAlgorithm):
+    """
+    A color that only depends on the position along the loop, so it is quantized into buckets
+    and every bucket is computed once into a packed table in the memo
+    """
+
+    _memo: ColorMemo
+    # (memo slot, inputs of _compute_color), replaced in a single assignment so a table filled
+    # on a worker thread keeps computing the configuration it started with
+    _config: Tuple[MemoSlot, tuple]
+
+    @property
+    def lookup_key(self) -> MemoSlot:
+        return self._config[0]
+
+    def _configure(self, key: Hashable, inputs: tuple) -> None:
+        """
+        Switch to the table of `key`, whose buckets are computed from `inputs`
+        """
+        self._config = (self._memo.slot(key, self.num_buckets), inputs)
+
+    def evaluate(self, percent: float, _: int, __: int) -> RGB:
+        offset_percent = (percent + self._offset) % 1.0
+        return self._lookup(offset_percent)
+
+    def evaluate_strip(
+        self, ratio: float, length: int, reverse: bool, scale: float
+    ) -> bytearray:
+        # Signed length supports reversing LED order
+        signed_length = length if reverse else -1 * length
+        divisor = signed_length * scale
+        table = self._packed_table()
+        frame = bytearray(length * 3)
+
+        if np is not None:
+            idx = np.arange(length)
+            offset_percent = (ratio + idx / divisor + self._offset) % 1.0
+            position = offset_percent * self.num_buckets
+            buckets = np.floor(position)
+            colors = np.frombuffer(table, dtype=np.uint8).reshape(self.num_buckets, 3)
+            out = np.frombuffer(frame, dtype=np.uint8).reshape(length, 3)
+            first = np.take(colors, buckets.astype(np.intp), axis=0, mode="wrap")
+            if not self.interpolate:
+                out[:] = first
+                return frame
+
+            second = np.take(colors, buckets.astype(np.intp) + 1, axis=0, mode="wrap")
+            fraction = (position - buckets)[:, np.newaxis]
+            first = first.astype(np.float64)
+            out[:] = np.rint(first + (second - first) * fraction)
+            return frame
+
+        for idx in range(length):
+            offset_percent = (ratio + idx / divisor + self._offset) % 1.0
+            if not self.interpolate:
+                start = self.get_bucket(offset_percent) * 3
+                frame[idx * 3 : idx * 3 + 3] = table[start : start + 3]
+                continue
+
+            bucket, fraction = self._bucket_fraction(offset_percent)
+            first = bucket * 3
+            second = (bucket + 1) % self.num_buckets * 3
+            for channel in range(3):
+                a = table[first + channel]
+                b = table[second + channel]
+                frame[idx * 3 + channel] = round(a + (b - a) * fraction)
+        return frame
+
+    def _packed_table(self) -> bytearray:
+        """
+        Every bucket of the current configuration packed as RGB bytes, built once per lookup key
+        """
+        config = self._config
+        lookup_key = config[0]
+        table = self._memo.get_packed(lookup_key)
+        if table is None:
+            table = bytearray(self.num_buckets * 3)
+            for bucket in range(self.num_buckets):
+                rgb = self._bucket_color(bucket, config)
+                table[bucket * 3 : bucket * 3 + 3] = rgb.as_bytes()
+            self._memo.set_packed(lookup_key, table)
+        return table
+
+    def _lookup(self, offset_percent: float) -> RGB:
+        """
+        Color of a position from the bucket table, blended with the next bucket when interpolating
+        """
+        config = self._config
+        if not self.interpolate:
+            return self._bucket_color(self.get_bucket(offset_percent), config)
+
+        bucket, fraction = self._bucket_fraction(offset_percent)
+        first = self._bucket_color(bucket, config)
+        second = self._bucket_color((bucket + 1) % self.num_buckets, config)
+        return RGB(
+            round(first.r + (second.r - first.r) * fraction),
+            round(first.g + (second.g - first.g) * fraction),
+            round(first.b + (second.b - first.b) * fraction),
+        )
+
+    def _bucket_fraction(self, offset_percent: float) -> Tuple[int, float]:
+        # How far past the start of its bucket a position is, 0.0 to 1.0
+        position = offset_percent * self.num_buckets
+        bucket = math.floor(position)
+        return bucket % self.num_buckets, position - bucket
+
+    def exact_color(self, offset_percent: float) -> RGB:
+        """
+        The unquantized color of a position, the reference bucket resolutions are measured against
+        """
+        inputs = self._config[1]
+        return self._compute_color(
+            offset_percent, offset_percent * self.num_buckets, inputs
+        )
+
+    def _bucket_color(self, bucket: int, config: Tuple[MemoSlot, tuple]) -> RGB:
+        lookup_key, inputs = config
+        precomputed = self._memo.get(lookup_key, bucket)
+        if precomputed:
+            return precomputed
+
+        # Always sample the start of the bucket so the memo does not depend on evaluation order
+        rgb = self._compute_color(bucket / self.num_buckets, bucket, inputs)
+        self._memo.set_value(lookup_key, bucket, rgb)
+        return rgb
+
+    @abstractmethod
+    def _compute_color(
+        self, offset_percent: float, bucket: float, inputs: tuple
+    ) -> RGB:
+        """
+        The color of a single bucket, bucket may be fractional. Everything else the color depends
+        on comes from `inputs`, never from attributes that can change while a table is filled
+        """
+        pass
+
+    def precompute(self, length: int) -> None:
+        self._packed_table()
+
+    def is_linear(self) -> bool:
+        return True
+
+
+class RainbowRGB(LinearColorAlgorithm):
     def __init__(
         self,
         offset: float,
         color_memo: ColorMemo,
         scale: float = 1.0,
         reverse: bool = False,
+        num_buckets: int = 50,
+        interpolate: bool = False,
     ):
         self._offset = offset
         self._memo = color_memo
-        self.num_buckets = 50
+        self.num_buckets = num_buckets
+        self.interpolate = interpolate
         self.scale = scale
         self.reverse = reverse
-        self.lookup_key = self._calculate_lookup_key()
-
-    def _calculate_lookup_key(self) -> str:
-        return hash(self.__class__.__name__ + f"sc_{self.scale}")
-
-    def evaluate(self, percent: float, _: int, __: int) -> RGB:
-        offset_percent = (percent + self._offset) % 1.0
-        bucket = self.get_bucket(offset_percent)
-
-        precomputed = self._memo.get(self.lookup_key, bucket)
-        if precomputed:
-            return precomputed
+        self._configure((self.__class__.__name__, self.scale, self.num_buckets), ())
 
+    def _compute_color(self, offset_percent: float, _: float, __: tuple) -> RGB:
         a = offset_percent * 2 * math.pi
         r = math.sin(a) * RGB_SCALAR + RGB_OFFSET
         g = math.sin(a - (2 * math.pi / 3)) * RGB_SCALAR + RGB_OFFSET
         b = math.sin(a - (4 * math.pi / 3)) * RGB_SCALAR + RGB_OFFSET
-
-        rgb = RGB(r, g, b)
-        self._memo.set_value(self.lookup_key, bucket, rgb)
-        return rgb
-
-    def is_linear(self):
-        return True
+        return RGB(r, g, b)
 
 
-class Comet(ColorAlgorithm):
+class Comet(LinearColorAlgorithm):
     def __init__(
         self,
         offset: float,
@@ -85,56 +239,50 @@ class Comet(ColorAlgorithm):
         scale: float = 1.0,
         reverse: bool = False,
         color_offset: float = 0.0,
+        num_buckets: int = 200,
+        interpolate: bool = False,
     ):
         self._offset = offset
         self._memo = color_memo
-        self.num_buckets = 200
+        self.num_buckets = num_buckets
+        self.interpolate = interpolate
         self.scale = scale
         self.reverse = reverse
         self._color_offset = color_offset
         self.adjustment_level = 0
-        self.lookup_key = self._calculate_lookup_key()
-
-    def _calculate_lookup_key(self) -> str:
-        return hash(
-            self.__class__.__name__
-            + f"sc_{self.scale}"
-            + f"co_{str(self._color_offset)}"
-            + f"al_{str(self.adjustment_level)}"
+        self._configure_level()
+
+    def _configure_level(self) -> None:
+        self._configure(
+            (
+                self.__class__.__name__,
+                self.scale,
+                self._color_offset,
+                self.adjustment_level,
+                self.num_buckets,
+            ),
+            (self.num_buckets, self._color_offset, self.adjustment_level),
         )
 
     def set_adjustment_level(self, level: int) -> None:
         self.adjustment_level = level
-        self.lookup_key = self._calculate_lookup_key()
-
-    def evaluate(self, percent: float, _: int, __: int) -> RGB:
-        offset_percent = (percent + self._offset) % 1.0
-        bucket = self.get_bucket(offset_percent)
-        precomputed = self._memo.get(self.lookup_key, bucket)
-        if precomputed:
-            return precomputed
+        self._configure_level()
 
+    def _compute_color(
+        self, offset_percent: float, bucket: float, inputs: tuple
+    ) -> RGB:
+        num_buckets, color_offset, adjustment_level = inputs
         dot_count = 3
-        count_per_grouping = self.num_buckets / dot_count
+        count_per_grouping = num_buckets / dot_count
         dropoff_factor = 1 / (count_per_grouping * 2 / 3)
-        mod = bucket % (self.num_buckets / dot_count)
+        mod = bucket % (num_buckets / dot_count)
         intensity = max(1 - (mod * dropoff_factor), 0)
 
-        a = (
-            offset_percent * 2 * math.pi
-            + self._color_offset
-            + (self.adjustment_level / 30.0)
-        )
+        a = offset_percent * 2 * math.pi + color_offset + (adjustment_level / 30.0)
         r = intensity * (math.sin(a) * RGB_SCALAR + RGB_OFFSET)
         g = intensity * (math.sin(a - (2 * math.pi / 3)) * RGB_SCALAR + RGB_OFFSET)
         b = intensity * (math.sin(a - (4 * math.pi / 3)) * RGB_SCALAR + RGB_OFFSET)
-
-        rgb = RGB(r, g, b)
-        self._memo.set_value(self.lookup_key, bucket, rgb)
-        return rgb
-
-    def is_linear(self):
-        return True
+        return RGB(r, g, b)
 
 
 class PurpleGreenOrangeComet(Comet):
@@ -144,12 +292,22 @@ class PurpleGreenOrangeComet(Comet):
         color_memo: ColorMemo,
         scale: float = 1.0,
         reverse: bool = False,
+        num_buckets: int = 200,
+        interpolate: bool = False,
     ):
         pgo_color_offset = 2 * math.pi / 3
-        super().__init__(offset, color_memo, scale, reverse, pgo_color_offset)
+        super().__init__(
+            offset,
+            color_memo,
+            scale,
+            reverse,
+            pgo_color_offset,
+            num_buckets,
+            interpolate,
+        )
 
 
-class PastelRGB(ColorAlgorithm):
+class PastelRGB(LinearColorAlgorithm):
     def __init__(
         self,
         offset: float,
@@ -162,131 +320,142 @@ class PastelRGB(ColorAlgorithm):
         blue_offset: float = 145,
         scale: float = 1.0,
         reverse=False,
+        num_buckets: int = 50,
+        interpolate: bool = False,
     ):
         self._offset = offset
         self._memo = color_memo
-        self._red_scalar = red_scalar
-        self._red_offset = red_offset
-        self._green_scalar = green_scalar
-        self._green_offset = green_offset
-        self._blue_scalar = blue_scalar
-        self._blue_offset = blue_offset
         self.scale = scale
-        self.lookup_key = hash(
-            self.__class__.__name__
-            + f"rs_{red_scalar}"
-            + f"ro_{red_offset}"
-            + f"gs_{green_scalar}"
-            + f"go_{green_offset}"
-            + f"bs_{blue_scalar}"
-            + f"bo_{blue_offset}"
-            + f"sc_{self.scale}"
-        )
-        self.num_buckets = 50
+        self.num_buckets = num_buckets
+        self.interpolate = interpolate
         self.reverse = reverse
+        inputs = (
+            red_scalar,
+            red_offset,
+            green_scalar,
+            green_offset,
+            blue_scalar,
+            blue_offset,
+        )
+        self._configure(
+            (self.__class__.__name__, *inputs, self.scale, self.num_buckets), inputs
+        )
 
-    def evaluate(self, percent: float, _: int, __: int) -> RGB:
-        offset_percent = (percent + self._offset) % 1.0
-        bucket = self.get_bucket(offset_percent)
-        precomputed = self._memo.get(self.lookup_key, bucket)
-        if precomputed:
-            return precomputed
-
+    def _compute_color(self, offset_percent: float, _: float, inputs: tuple) -> RGB:
+        red_scalar, red_offset, green_scalar, green_offset, blue_scalar, blue_offset = (
+            inputs
+        )
         a = offset_percent * 2 * math.pi
-        r = self._red_scalar * (math.sin(a) + 1) + self._red_offset
-        g = self._green_scalar * (math.sin(a - (2 * math.pi / 3))) + self._green_offset
-        b = self._blue_scalar * (math.sin(a - (4 * math.pi / 3))) + self._blue_offset
+        r = red_scalar * (math.sin(a) + 1) + red_offset
+        g = green_scalar * (math.sin(a - (2 * math.pi / 3))) + green_offset
+        b = blue_scalar * (math.sin(a - (4 * math.pi / 3))) + blue_offset
+        return RGB(r, g, b)
 
-        rgb = RGB(r, g, b)
-        self._memo.set_value(self.lookup_key, bucket, rgb)
-        return rgb
 
-    def is_linear(self):
-        return True
+class PaletteAlgorithm(LinearColorAlgorithm):
+    """
+    Colors from an arbitrary keyframe palette, compiled once into the bucket table.
 
+    Rendering is the same table gather as RainbowRGB, however many keyframes the palette has.
+    """
 
-class Yoyo(ColorAlgorithm):
     def __init__(
         self,
         offset: float,
         color_memo: ColorMemo,
+        palette: Palette,
         scale: float = 1.0,
         reverse: bool = False,
-        color_offset: float = 0.0,
+        num_buckets: int = 256,
+        interpolate: bool = False,
     ):
         self._offset = offset
         self._memo = color_memo
-        self.num_buckets = 200
+        self.num_buckets = num_buckets
+        self.interpolate = interpolate
         self.scale = scale
         self.reverse = reverse
-        self._color_offset = color_offset
-        self.adjustment_level = 0
-        self.lookup_key = self._calculate_lookup_key()
-
-    def _calculate_lookup_key(self) -> str:
-        return hash(
-            self.__class__.__name__
-            + f"sc_{self.scale}"
-            + f"co_{str(self._color_offset)}"
-            + f"al_{str(self.adjustment_level)}"
+        # The table only depends on the keyframes, so every use of a palette shares one
+        self._configure(
+            (self.__class__.__name__, palette.key(), self.num_buckets), (palette,)
         )
 
-    def set_adjustment_level(self, level: int) -> None:
-        self.adjustment_level = level
-        self.lookup_key = self._calculate_lookup_key()
+    def _compute_color(self, offset_percent: float, _: float, inputs: tuple) -> RGB:
+        (palette,) = inputs
+        return palette.color_at(offset_percent)
+
+
+class Yoyo(ColorAlgorithm):
+    """
+    A white window bouncing along the strip, its tail is longest in the middle.
+
+    Everything about a frame depends only on the bucket, so the lit window is computed once in
+    closed form and filled as a single range instead of being memoized per LED.
+    """
+
+    def __init__(
+        self,
+        offset: float,
+        scale: float = 1.0,
+        reverse: bool = False,
+        num_buckets: int = 200,
+    ):
+        self._offset = offset
+        # Frames are computed in closed form, only the head position is quantized
+        self.num_buckets = num_buckets
+        self.interpolate = False
+        self.scale = scale
+        self.reverse = reverse
+        # (bucket, length, start, stop) of the last window, evaluate is called once per LED
+        self._last_window = (-1, 0, 0, 0)
+
+    def evaluate_strip(
+        self, ratio: float, length: int, reverse: bool, scale: float
+    ) -> bytearray:
+        bucket = self.get_bucket(ratio * scale + self._offset)
+        start, stop = self._window(bucket, length)
+        frame = bytearray(length * 3)
+        frame[start * 3 : stop * 3] = b"\xff" * ((stop - start) * 3)
+        return frame
 
     def evaluate(self, percent: float, idx: int, total_count: int) -> RGB:
+        bucket = self.get_bucket(percent + self._offset)
+        last_bucket, last_length, start, stop = self._last_window
+        if bucket != last_bucket or total_count != last_length:
+            start, stop = self._window(bucket, total_count)
+            self._last_window = (bucket, total_count, start, stop)
+
+        intensity = 1 if start <= idx < stop else 0
+        return RGB(intensity * 255, intensity * 255, intensity * 255)
+
+    def _window(self, bucket: int, length: int) -> Tuple[int, int]:
+        """
+        The [start, stop) range of lit LEDs for a bucket, clamped to the strip
+        """
+        # Always sample the start of the bucket so frames do not depend on evaluation order
         # 2.0 is for the yoyo effect
-        original_offset_percent = percent + self._offset
-        offset_percent = abs((2 * original_offset_percent) % 2.0)
+        offset_percent = (2 * bucket / self.num_buckets) % 2.0
         reverse = False
         if offset_percent >= 1.0:
             offset_percent = 2 - offset_percent
             reverse = True
 
-        bucket = self.get_bucket(original_offset_percent)
-        full_key = f"{idx}_{bucket}"
-        precomputed = self._memo.get(self.lookup_key, full_key)
-        if precomputed:
-            return precomputed
-
         # less dropoff in the middle
         tail_length_percent = math.sin(offset_percent * math.pi) / 4.0
-        tail_length_count = tail_length_percent * total_count
+        tail_length_count = tail_length_percent * length
 
-        intensity = 0
+        # The tail trails the head in the direction of travel, the head itself is always lit
+        head_idx = math.floor(offset_percent * length)
         if reverse:
-            head_idx = math.floor(offset_percent * total_count)
-            if head_idx + tail_length_count >= idx and idx >= head_idx:
-                intensity = 1
+            start = head_idx
+            stop = math.floor(head_idx + tail_length_count) + 1
         else:
-            head_idx = math.floor(offset_percent * total_count)
-            if head_idx - tail_length_count <= idx and idx <= head_idx:
-                intensity = 1
-
-        # for each bucket, use the tail length to determine if the specific idx should be displayed
-        # dropoff_factor = 1 / (count_per_grouping * diff)
-
-        # intensity = max(1 - (bucket * dropoff_factor), 0)
-        # intensity = diff
-
-        # white
-        r = intensity * 255
-        g = intensity * 255
-        b = intensity * 255
-
-        # highlight head in red
-        # if idx == head_idx:
-        #     r = 255
-        #     g = 0
-        #     b = 0
-        #     # print(
-        #     #     f"offset_percent: {round(offset_percent, 2)}, tail_length_percent: {round(tail_length_percent, 2)}, tail length count: {round(tail_length_count, 2)}"
-        #     # )
-
-        rgb = RGB(r, g, b)
-        self._memo.set_value(self.lookup_key, full_key, rgb)
-        return rgb
+            start = math.ceil(head_idx - tail_length_count)
+            stop = head_idx + 1
+
+        start = min(max(start, 0), length)
+        stop = min(max(stop, start), length)
+        return start, stop
 
     def is_linear(self):
         return False
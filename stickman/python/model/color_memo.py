@@ -1,17 +1,213 @@
-from typing import Optional
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
 
 from model.rgb import RGB
 
+_RGB_SAMPLE = RGB(0, 0, 0)
+RGB_BYTES: int = sys.getsizeof(_RGB_SAMPLE) + sys.getsizeof(_RGB_SAMPLE.__dict__)
+
+
+def _value_bytes(value: Any) -> int:
+    if isinstance(value, RGB):
+        return RGB_BYTES
+    return sys.getsizeof(value)
+
+
+class MemoSlot:
+    """
+    Handle to the table of one algorithm configuration, returned by ColorMemo.slot()
+    """
+
+    __slots__ = ("config", "size", "index")
+
+    def __init__(self, config: Hashable, size: int):
+        self.config = config
+        self.size = size
+        # Key of the table in the memo, a new one every time the configuration is registered
+        self.index = -1
+
+
+class _Table:
+    __slots__ = ("slot", "values", "packed", "bytes")
+
+    def __init__(self, slot: MemoSlot):
+        self.slot = slot
+        self.values: List[Optional[Any]] = [None] * slot.size
+        self.packed: Optional[bytearray] = None
+        self.bytes = 0
+
+
+# Bookkeeping of one resident table besides its values
+SLOT_BYTES: int = sys.getsizeof(MemoSlot(None, 0)) + sys.getsizeof(
+    _Table(MemoSlot(None, 0))
+)
+
 
 class ColorMemo:
-    def __init__(self):
-        self._memo = {}
+    """
+    Precomputed color results, one preallocated flat table per algorithm configuration.
+
+    Each configuration is registered once and gets a MemoSlot handle, so lookups on the hot path
+    are an integer dict lookup and list indexing with no hashing of the configuration.
+
+    When `max_bytes` is set, the least recently used tables are freed once the resident size
+    goes over the limit, together with all of their bookkeeping. A handle whose table was freed
+    misses, and registers its configuration again the next time a color is stored through it.
+
+    Access is locked so tables can be precomputed on a worker thread while rendering reads them.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self._max_bytes = max_bytes
+        self._slots: Dict[Hashable, MemoSlot] = {}
+        # Resident tables by slot index, least recently used first
+        self._tables: "OrderedDict[int, _Table]" = OrderedDict()
+        self._next_index = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._resident_bytes = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled, e.g. when algorithms are sent to render worker processes
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def slot(self, config: Hashable, size: int) -> MemoSlot:
+        """
+        Get the slot for an algorithm configuration, allocating a table of `size` entries on first use
+        """
+        with self._lock:
+            slot = self._slots.get(config)
+            if slot is None:
+                slot = MemoSlot(config, size)
+                self._register(slot)
+            return slot
+
+    def set_value(self, slot: MemoSlot, index: int, value: RGB):
+        with self._lock:
+            table = self._tables.get(slot.index)
+            if table is None:
+                table = self._register(slot)
+
+            previous = table.values[index]
+            if previous is not None:
+                self._account(table, -1 * _value_bytes(previous))
+            table.values[index] = value
+            self._account(table, _value_bytes(value))
+            self._tables.move_to_end(slot.index)
+            self._evict()
+
+    def get(self, slot: MemoSlot, index: int) -> Optional[RGB]:
+        with self._lock:
+            table = self._tables.get(slot.index)
+            value = None if table is None else table.values[index]
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._tables.move_to_end(slot.index)
+            return value
+
+    def set_packed(self, slot: MemoSlot, packed: bytearray):
+        with self._lock:
+            table = self._tables.get(slot.index)
+            if table is None:
+                table = self._register(slot)
+
+            if table.packed is not None:
+                self._account(table, -1 * sys.getsizeof(table.packed))
+            table.packed = packed
+            self._account(table, sys.getsizeof(packed))
+            self._tables.move_to_end(slot.index)
+            self._evict()
+
+    def get_packed(self, slot: MemoSlot) -> Optional[bytearray]:
+        """
+        Get the whole table of a slot packed as RGB bytes, if it has been built
+        """
+        with self._lock:
+            table = self._tables.get(slot.index)
+            packed = None if table is None else table.packed
+            if packed is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._tables.move_to_end(slot.index)
+            return packed
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        return self._max_bytes
+
+    def __len__(self) -> int:
+        """
+        Number of resident tables
+        """
+        return len(self._tables)
+
+    def _register(self, slot: MemoSlot) -> _Table:
+        """
+        Give a slot a table, sharing the one of another live handle of the same configuration
+        """
+        live = self._slots.get(slot.config)
+        if live is not None and live is not slot and live.index in self._tables:
+            slot.index = live.index
+            return self._tables[slot.index]
+
+        # Indexes are never reused, so a stale handle can never read another configuration
+        slot.index = self._next_index
+        self._next_index += 1
+        self._slots[slot.config] = slot
+        table = _Table(slot)
+        self._tables[slot.index] = table
+        self._account(
+            table,
+            SLOT_BYTES + sys.getsizeof(slot.config) + sys.getsizeof(table.values),
+        )
+        self._evict()
+        return table
 
-    def set_value(self, algorithm_key: str, percent: str, value: RGB):
-        if not algorithm_key in self._memo:
-            self._memo[algorithm_key] = {}
+    def _account(self, table: _Table, size: int):
+        table.bytes += size
+        self._resident_bytes += size
 
-        self._memo[algorithm_key][percent] = value
+    def _evict(self):
+        """
+        Free least recently used tables until the memo fits in max_bytes, never the one in use
+        """
+        if self._max_bytes is None:
+            return
 
-    def get(self, algorithm_key: str, percent: str) -> Optional[RGB]:
-        return self._memo.get(algorithm_key, {}).get(percent, None)
+        while self._resident_bytes > self._max_bytes and len(self._tables) > 1:
+            _, table = self._tables.popitem(last=False)
+            self._resident_bytes -= table.bytes
+            config = table.slot.config
+            if self._slots.get(config) is table.slot:
+                del self._slots[config]
+            self._evictions += 1
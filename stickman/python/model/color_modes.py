@@ -0,0 +1,117 @@
+from typing import Dict, List
+
+from model.body_group import BodyGroup
+from model.color_algorithm import (
+    ColorAlgorithm,
+    PaletteAlgorithm,
+    PastelRGB,
+    PurpleGreenOrangeComet,
+    RainbowRGB,
+    Yoyo,
+)
+from model.color_memo import ColorMemo
+from model.palette import ColorPoint, Palette
+
+# The elmo fire colors, mirrored so the strip wraps around without a seam
+FIRE_PALETTE = Palette(
+    [
+        ColorPoint(0.0, 255, 126, 50),
+        ColorPoint(0.1, 255, 101, 0),
+        ColorPoint(0.2, 254, 81, 13),
+        ColorPoint(0.3, 243, 60, 4),
+        ColorPoint(0.4, 218, 31, 5),
+        ColorPoint(0.5, 161, 1, 0),
+        ColorPoint(0.6, 218, 31, 5),
+        ColorPoint(0.7, 243, 60, 4),
+        ColorPoint(0.8, 254, 81, 13),
+        ColorPoint(0.9, 255, 101, 0),
+        ColorPoint(1.0, 255, 126, 50),
+    ]
+)
+
+
+def make_color_modes(color_memo: ColorMemo) -> Dict[str, BodyGroup]:
+    """
+    Build every color mode of the costume, keyed by mode name
+    """
+    # Coloring algorithms
+    rainbow_rgb_no_offset = RainbowRGB(0, color_memo)
+    rainbow_rgb_arm_reverse = RainbowRGB(2 / 3, color_memo, reverse=True)
+    rainbow_rgb_reverse_no_offset = RainbowRGB(0, color_memo, reverse=True)
+
+    rainbow_rgb_scale3 = RainbowRGB(0, color_memo, scale=3.0)
+    rainbow_rgb_scale3_reverse = RainbowRGB(0, color_memo, scale=3.0, reverse=True)
+    rainbow_rgb_scale3_arm_reverse = RainbowRGB(
+        0.2, color_memo, scale=3.0, reverse=True
+    )
+
+    pastel_rgb_1_values = []  # default settings
+    pastel_rgb_2_values = [50, 105, 110, 145, 80, 145]
+    pastel_rgb_3_values = [10, 105, 110, 145, 40, 145]
+
+    def _pastel_body(rgb_config: List[int]) -> List[ColorAlgorithm]:
+        """
+        Takes a list of pastel config values and outputs the color algorithms for a pastel body
+        """
+        return [
+            PastelRGB(0, color_memo, *rgb_config, scale=1.0),
+            PastelRGB(0, color_memo, *rgb_config, scale=3.0, reverse=True),
+            PastelRGB(0.2, color_memo, *rgb_config, scale=3.0, reverse=True),
+            PastelRGB(0.2, color_memo, *rgb_config, scale=3.0, reverse=True),
+            PastelRGB(0, color_memo, *rgb_config, scale=3.0),
+            PastelRGB(0, color_memo, *rgb_config, scale=3.0),
+        ]
+
+    return {
+        "rainbow": BodyGroup(
+            rainbow_rgb_no_offset,
+            rainbow_rgb_reverse_no_offset,
+            rainbow_rgb_arm_reverse,
+            rainbow_rgb_arm_reverse,
+            rainbow_rgb_no_offset,
+            rainbow_rgb_no_offset,
+        ),
+        "rainbow_long": BodyGroup(
+            rainbow_rgb_no_offset,
+            rainbow_rgb_scale3_reverse,
+            rainbow_rgb_scale3_arm_reverse,
+            rainbow_rgb_scale3_arm_reverse,
+            rainbow_rgb_scale3,
+            rainbow_rgb_scale3,
+        ),
+        "pastel_rgb": BodyGroup(*_pastel_body(pastel_rgb_1_values)),
+        "pastel_rgb_2": BodyGroup(*_pastel_body(pastel_rgb_2_values)),
+        "pastel_rgb_3": BodyGroup(*_pastel_body(pastel_rgb_3_values)),
+        "pgo_comet": BodyGroup(
+            PurpleGreenOrangeComet(0, color_memo),
+            PurpleGreenOrangeComet(0, color_memo, reverse=True),
+            PurpleGreenOrangeComet(2 / 3, color_memo, reverse=True),
+            PurpleGreenOrangeComet(2 / 3, color_memo, reverse=True),
+            PurpleGreenOrangeComet(0, color_memo),
+            PurpleGreenOrangeComet(0, color_memo),
+        ),
+        "pgo_comet_in_to_out": BodyGroup(
+            PurpleGreenOrangeComet(0, color_memo),
+            PurpleGreenOrangeComet(0, color_memo, scale=8),
+            PurpleGreenOrangeComet(1 / 4, color_memo, scale=8),
+            PurpleGreenOrangeComet(1 / 4, color_memo, scale=8),
+            PurpleGreenOrangeComet(3 / 4, color_memo, scale=8),
+            PurpleGreenOrangeComet(3 / 4, color_memo, scale=8),
+        ),
+        "fire": BodyGroup(
+            PaletteAlgorithm(0, color_memo, FIRE_PALETTE),
+            PaletteAlgorithm(0, color_memo, FIRE_PALETTE, scale=2.0, reverse=True),
+            PaletteAlgorithm(0.2, color_memo, FIRE_PALETTE, scale=2.0, reverse=True),
+            PaletteAlgorithm(0.2, color_memo, FIRE_PALETTE, scale=2.0, reverse=True),
+            PaletteAlgorithm(0, color_memo, FIRE_PALETTE, scale=2.0),
+            PaletteAlgorithm(0, color_memo, FIRE_PALETTE, scale=2.0),
+        ),
+        "yoyo": BodyGroup(
+            Yoyo(0),
+            Yoyo(0),
+            Yoyo(0),
+            Yoyo(0),
+            Yoyo(0),
+            Yoyo(0),
+        ),
+    }
@@ -0,0 +1,128 @@
+import mmap
+import struct
+from typing import BinaryIO, Dict, Iterable, Iterator
+
+from model.framebuffer import Framebuffer
+
+MAGIC = b"LEDF"
+VERSION = 1
+
+# magic, version, fps, frames per mode, strip count, mode count
+_HEADER = struct.Struct("<4sHHIHH")
+_STRIP = struct.Struct("<H")
+_MODE = struct.Struct("<Q")
+
+
+def _write_name(f: BinaryIO, name: str):
+    encoded = name.encode("utf-8")
+    f.write(struct.pack("<B", len(encoded)))
+    f.write(encoded)
+
+
+def write_frame_file(
+    path: str,
+    fps: int,
+    frame_count: int,
+    lengths: Dict[str, int],
+    modes: Dict[str, Iterable[bytes]],
+):
+    """
+    Write pre-rendered loops to a compact binary file.
+
+    The header lists the strips (name, LED count) and the modes (name, byte offset of the first
+    frame). Every frame is the packed RGB bytes of all strips back to back, in strip order.
+    """
+    frame_size = sum(lengths.values()) * 3
+    with open(path, "wb") as f:
+        f.write(
+            _HEADER.pack(MAGIC, VERSION, fps, frame_count, len(lengths), len(modes))
+        )
+        for name, length in lengths.items():
+            _write_name(f, name)
+            f.write(_STRIP.pack(length))
+
+        # Mode offsets are only known after the table is written, fill them in afterwards
+        mode_table_start = f.tell()
+        for name in modes:
+            _write_name(f, name)
+            f.write(_MODE.pack(0))
+
+        offsets = []
+        for frames in modes.values():
+            offsets.append(f.tell())
+            written = 0
+            for frame in frames:
+                if len(frame) != frame_size:
+                    raise ValueError(
+                        f"Expected {frame_size} bytes per frame, got {len(frame)}"
+                    )
+                f.write(frame)
+                written += 1
+            if written != frame_count:
+                raise ValueError(
+                    f"Expected {frame_count} frames per mode, got {written}"
+                )
+
+        f.seek(mode_table_start)
+        for name, offset in zip(modes, offsets):
+            _write_name(f, name)
+            f.write(_MODE.pack(offset))
+
+
+class FrameFile:
+    """
+    Memory-mapped reader for files written by write_frame_file, frames are served without copies
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, fps, frame_count, strip_count, mode_count = _HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} LED frame file")
+        self.fps: int = fps
+        self.frame_count: int = frame_count
+
+        position = _HEADER.size
+        self.lengths: Dict[str, int] = {}
+        for _ in range(strip_count):
+            name, position = self._read_name(position)
+            (self.lengths[name],) = _STRIP.unpack_from(self._mmap, position)
+            position += _STRIP.size
+
+        self._mode_offsets: Dict[str, int] = {}
+        for _ in range(mode_count):
+            name, position = self._read_name(position)
+            (self._mode_offsets[name],) = _MODE.unpack_from(self._mmap, position)
+            position += _MODE.size
+
+        self.frame_size: int = sum(self.lengths.values()) * 3
+
+    def _read_name(self, position: int):
+        size = self._mmap[position]
+        start = position + 1
+        return bytes(self._mmap[start : start + size]).decode("utf-8"), start + size
+
+    @property
+    def modes(self) -> Iterable[str]:
+        return self._mode_offsets.keys()
+
+    def frame(self, mode: str, index: int) -> memoryview:
+        start = self._mode_offsets[mode] + (index % self.frame_count) * self.frame_size
+        return self._view[start : start + self.frame_size]
+
+    def framebuffer(self, mode: str, index: int) -> Framebuffer:
+        return Framebuffer(self.lengths, self.frame(mode, index))
+
+    def frames(self, mode: str) -> Iterator[Framebuffer]:
+        for index in range(self.frame_count):
+            yield self.framebuffer(mode, index)
+
+    def close(self):
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
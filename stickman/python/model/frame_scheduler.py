@@ -0,0 +1,53 @@
+import math
+from typing import Callable, Optional
+
+from model.frame_stats import FrameStats
+
+
+class FrameScheduler:
+    """
+    Schedules frames on absolute deadlines counted from a start time, frame n is due at
+    start + n * period. Render time is subtracted from the wait, and frames whose deadline
+    already passed are skipped instead of queued, so the animation never drifts behind.
+    Skipped frames are counted in frame_stats when given.
+    """
+
+    def __init__(
+        self,
+        target_hz: float,
+        start_ms: int,
+        clock_ms: Callable[[], int],
+        frame_stats: Optional[FrameStats] = None,
+    ):
+        self._period_ms = 1000 / target_hz
+        self._start_ms = start_ms
+        self._clock_ms = clock_ms
+        self._frame_stats = frame_stats
+        self._frame_index = 0
+        self.skipped_frames = 0
+
+    @property
+    def target_hz(self) -> float:
+        return 1000 / self._period_ms
+
+    def frame_time_ms(self) -> float:
+        """
+        Time of the current frame's deadline since the start, use it for the animation phase
+        """
+        return self._start_ms + self._frame_index * self._period_ms
+
+    def next_delay_ms(self) -> int:
+        """
+        Advance to the next frame that is still in the future and return the wait until it is due
+        """
+        now_ms = self._clock_ms()
+        next_index = self._frame_index + 1
+        due_index = math.floor((now_ms - self._start_ms) / self._period_ms) + 1
+        if due_index > next_index:
+            self.skipped_frames += due_index - next_index
+            if self._frame_stats:
+                self._frame_stats.skip(due_index - next_index)
+            next_index = due_index
+
+        self._frame_index = next_index
+        return max(0, round(self.frame_time_ms() - now_ms))
@@ -0,0 +1,169 @@
+import csv
+import json
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# A frame is late once it starts more than half a period after the previous one was due
+LATE_TOLERANCE = 1.5
+
+
+class FrameRecord:
+    start_s: float
+    interval_ms: float
+    compute_ms: float
+    present_ms: float
+    strip_ms: Dict[str, float]
+    late: bool
+    dropped: int
+    skipped: int
+
+    def __init__(
+        self,
+        start_s: float,
+        interval_ms: float,
+        compute_ms: float,
+        present_ms: float,
+        strip_ms: Dict[str, float],
+        period_ms: float,
+        skipped: int,
+    ):
+        self.start_s = start_s
+        self.interval_ms = interval_ms
+        self.compute_ms = compute_ms
+        self.present_ms = present_ms
+        self.strip_ms = strip_ms
+        self.late = interval_ms > period_ms * LATE_TOLERANCE
+        # Whole frame periods that passed without a frame being shown
+        self.dropped = max(0, round(interval_ms / period_ms) - 1)
+        # Frames the scheduler skipped since the previous one, without rendering them
+        self.skipped = skipped
+
+    def as_dict(self) -> Dict:
+        return {
+            "start_s": self.start_s,
+            "interval_ms": self.interval_ms,
+            "compute_ms": self.compute_ms,
+            "present_ms": self.present_ms,
+            "late": self.late,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            **{f"{name}_ms": ms for name, ms in self.strip_ms.items()},
+        }
+
+
+class FrameStats:
+    """
+    Frame timing of the update loop: compute, per strip and output push time, achieved FPS and
+    late, dropped or skipped frames against the target refresh rate.
+
+    Rolling numbers cover the last `window` frames. With keep_trace every frame is kept so it
+    can be dumped to CSV or JSON afterwards.
+    """
+
+    def __init__(self, target_hz: float, window: int = 60, keep_trace: bool = False):
+        self._period_ms = 1000 / target_hz
+        self._window: Deque[FrameRecord] = deque(maxlen=window)
+        self._trace: Optional[List[FrameRecord]] = [] if keep_trace else None
+        self._last_start_s: Optional[float] = None
+        self.frame_count = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.skipped_frames = 0
+        self._pending_skips = 0
+
+    def skip(self, count: int):
+        """
+        Count frames skipped on purpose because their deadline had already passed
+        """
+        self.skipped_frames += count
+        self._pending_skips += count
+
+    def record(
+        self,
+        start_s: float,
+        compute_s: float,
+        present_s: float,
+        strip_s: Dict[str, float],
+    ):
+        interval_ms = (
+            self._period_ms
+            if self._last_start_s is None
+            else (start_s - self._last_start_s) * 1000
+        )
+        self._last_start_s = start_s
+
+        record = FrameRecord(
+            start_s,
+            interval_ms,
+            compute_s * 1000,
+            present_s * 1000,
+            {name: seconds * 1000 for name, seconds in strip_s.items()},
+            self._period_ms,
+            self._pending_skips,
+        )
+        self._pending_skips = 0
+        self.frame_count += 1
+        self.late_frames += record.late
+        self.dropped_frames += record.dropped
+        self._window.append(record)
+        if self._trace is not None:
+            self._trace.append(record)
+
+    @property
+    def fps(self) -> float:
+        if len(self._window) < 2:
+            return 0.0
+        elapsed_s = self._window[-1].start_s - self._window[0].start_s
+        return (len(self._window) - 1) / elapsed_s if elapsed_s > 0 else 0.0
+
+    @property
+    def compute_ms(self) -> float:
+        return _mean([record.compute_ms for record in self._window])
+
+    @property
+    def present_ms(self) -> float:
+        return _mean([record.present_ms for record in self._window])
+
+    @property
+    def worst_frame_ms(self) -> float:
+        return max(
+            (record.compute_ms + record.present_ms for record in self._window),
+            default=0.0,
+        )
+
+    def strip_ms(self) -> Dict[str, float]:
+        if not self._window:
+            return {}
+        names = self._window[-1].strip_ms.keys()
+        return {
+            name: _mean([record.strip_ms.get(name, 0.0) for record in self._window])
+            for name in names
+        }
+
+    def summary(self) -> str:
+        return (
+            f"FPS: {self.fps:.1f} | compute: {self.compute_ms:.2f} ms"
+            f" | push: {self.present_ms:.2f} ms | worst: {self.worst_frame_ms:.2f} ms"
+            f" | late: {self.late_frames} | dropped: {self.dropped_frames}"
+            f" | skipped: {self.skipped_frames}"
+        )
+
+    def dump(self, path: str):
+        """
+        Write the kept trace to path, as JSON if it ends in .json and CSV otherwise
+        """
+        records = [record.as_dict() for record in self._trace or []]
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump(records, f, indent=2)
+            return
+
+        with open(path, "w", newline="") as f:
+            if records:
+                writer = csv.DictWriter(f, fieldnames=list(records[0].keys()))
+                writer.writeheader()
+                writer.writerows(records)
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
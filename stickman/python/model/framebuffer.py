@@ -0,0 +1,44 @@
+from typing import Dict, List, Optional, Union
+
+
+class Framebuffer:
+    """
+    Packed RGB bytes of every strip in a body, stored back to back in one contiguous buffer.
+
+    An existing buffer, e.g. a frame inside a memory-mapped file, can be wrapped without a copy.
+    """
+
+    pixels: Union[bytearray, memoryview]
+
+    def __init__(
+        self,
+        lengths: Dict[str, int],
+        pixels: Optional[Union[bytearray, memoryview]] = None,
+    ):
+        self._offsets: Dict[str, int] = {}
+        self._lengths = dict(lengths)
+
+        offset = 0
+        for name, length in lengths.items():
+            self._offsets[name] = offset
+            offset += length * 3
+        self.pixels = bytearray(offset) if pixels is None else pixels
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._offsets.keys())
+
+    @property
+    def lengths(self) -> Dict[str, int]:
+        return self._lengths
+
+    def offset(self, name: str) -> int:
+        return self._offsets[name]
+
+    def strip(self, name: str) -> memoryview:
+        start = self._offsets[name]
+        return memoryview(self.pixels)[start : start + self._lengths[name] * 3]
+
+    def set_strip(self, name: str, frame: bytearray):
+        start = self._offsets[name]
+        self.pixels[start : start + self._lengths[name] * 3] = frame
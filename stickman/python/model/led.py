@@ -1,91 +1,120 @@
-from tkinter import Canvas
-from typing import Any, List, Optional
+from array import array
+from typing import List, Optional
 
 from model.color_algorithm import ColorAlgorithm
-from model.point2d import Point2D
 from model.rgb import RGB
 
 RADIUS = 2
 
 
-def _hex_color(rgb: RGB) -> str:
-    return "#{0:02x}{1:02x}{2:02x}".format(rgb.r, rgb.g, rgb.b)
+class LED:
+    """
+    Lightweight view of one LED, the data itself lives in the arrays of its LEDStrip
+    """
 
+    __slots__ = ("_strip", "_index")
 
-class LED:
-    x: float
-    y: float
-    r: int
-    g: int
-    b: int
-    _tk_id: Any
-
-    def __init__(self, x: float, y: float, r: int, g: int, b: int, canvas: Canvas):
-        self.x = x
-        self.y = y
-        self.r = r
-        self.g = g
-        self.b = b
-        self._canvas = canvas
-        self._tk_id = self._create_circle(Point2D(x, y), r, g, b, self._canvas)
-
-    def _create_circle(
-        self, center: Point2D, r: int, g: int, b: int, canvas: Canvas
-    ) -> int:
-        x0 = center.x - RADIUS
-        y0 = center.y - RADIUS
-        x1 = center.x + RADIUS
-        y1 = center.y + RADIUS
-        rgb = RGB(r, g, b)
-
-        hex_code = _hex_color(rgb)
-        return canvas.create_oval(x0, y0, x1, y1, fill=hex_code, outline=hex_code)
+    def __init__(self, strip: "LEDStrip", index: int):
+        self._strip = strip
+        self._index = index
+
+    @property
+    def x(self) -> float:
+        return self._strip.xs[self._index]
+
+    @property
+    def y(self) -> float:
+        return self._strip.ys[self._index]
+
+    @property
+    def r(self) -> int:
+        return self._strip.colors[self._index * 3]
+
+    @property
+    def g(self) -> int:
+        return self._strip.colors[self._index * 3 + 1]
+
+    @property
+    def b(self) -> int:
+        return self._strip.colors[self._index * 3 + 2]
 
     def update_color(self, rgb: RGB):
-        new_hex = _hex_color(rgb)
-        self._canvas.itemconfig(self._tk_id, fill=new_hex, outline=new_hex)
+        start = self._index * 3
+        self._strip.colors[start : start + 3] = rgb.as_bytes()
 
 
 class LEDStrip:
+    """
+    LED positions and colors stored struct-of-arrays: x and y as contiguous doubles and the
+    colors of the last rendered frame as packed RGB bytes
+    """
+
     length: int
-    _leds = List[LED]
+    xs: array
+    ys: array
+    colors: bytearray
     _color_algorithm = ColorAlgorithm
 
     def __init__(self):
         self.length = 0
-        self._leds = []
+        self.xs = array("d")
+        self.ys = array("d")
+        self.colors = bytearray()
         self._color_algorithm = None
 
-    def add_led(self, led: LED):
+    def add_led(self, x: float, y: float, r: int, g: int, b: int):
         self.length += 1
-        self._leds.append(led)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.colors += RGB(r, g, b).as_bytes()
+
+    def placed(
+        self, dx: float = 0.0, dy: float = 0.0, scale: float = 1.0
+    ) -> "LEDStrip":
+        """
+        Copy of the strip with every position scaled around the origin and then offset
+        """
+        strip = LEDStrip()
+        strip.length = self.length
+        strip.xs = array("d", (x * scale + dx for x in self.xs))
+        strip.ys = array("d", (y * scale + dy for y in self.ys))
+        strip.colors = bytearray(self.colors)
+        strip._color_algorithm = self._color_algorithm
+        return strip
 
     def set_color_algorithm(self, color_algorithm: ColorAlgorithm):
         self._color_algorithm = color_algorithm
 
-    def update(self, ratio: float):
+    def render(self, ratio: float) -> bytearray:
         """
-        Render the LEDs in the strip according to the color algorithm
+        Compute the LED colors of the strip according to the color algorithm, as packed RGB bytes
         """
-        # Signed length supports reversing LED order
-        signed_length = (
-            self.length if self._color_algorithm.is_reverse() else -1 * self.length
+        frame = self._color_algorithm.evaluate_strip(
+            ratio,
+            self.length,
+            self._color_algorithm.is_reverse(),
+            self._color_algorithm.scale,
         )
+        self.colors[:] = frame
+        return frame
 
-        for idx, led in enumerate(self.leds):
-            if self._color_algorithm.is_linear():
-                percent = ratio + (idx / (signed_length * self._color_algorithm.scale))
-            else:
-                percent = ratio * self._color_algorithm.scale
-            rgb = self._color_algorithm.evaluate(percent, idx, self.length)
-            led.update_color(rgb)
+    def set_colors(self, frame: bytearray):
+        self.colors[:] = frame
 
     def update_algorithm(self, algorithm: ColorAlgorithm):
         self._color_algorithm = algorithm
 
+    @property
+    def color_algorithm(self) -> ColorAlgorithm:
+        return self._color_algorithm
+
     def at(self, index: int) -> Optional[LED]:
-        return self._leds[index]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("LED index out of range")
+        return LED(self, index)
 
     @property
     def leds(self) -> List[LED]:
-        return self._leds
+        return [LED(self, index) for index in range(self.length)]
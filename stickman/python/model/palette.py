@@ -0,0 +1,62 @@
+from bisect import bisect_right
+from typing import List, Tuple
+
+from model.rgb import RGB
+
+
+class ColorPoint:
+    """
+    A keyframe color at a position between 0.0 and 1.0 along a palette
+    """
+
+    def __init__(self, point: float, r: float, g: float, b: float):
+        self.point = point
+        self.r = r
+        self.g = g
+        self.b = b
+
+
+class Palette:
+    """
+    A gradient through keyframe colors, linearly interpolated between neighbouring keyframes.
+
+    Positions before the first or after the last keyframe get that keyframe's color.
+    """
+
+    color_points: List[ColorPoint]
+
+    def __init__(self, color_points: List[ColorPoint]):
+        if not color_points:
+            raise ValueError("A palette needs at least one color point")
+        self.color_points = sorted(
+            color_points, key=lambda color_point: color_point.point
+        )
+        self._points = [color_point.point for color_point in self.color_points]
+
+    def color_at(self, point: float) -> RGB:
+        if point <= self._points[0]:
+            first = self.color_points[0]
+            return RGB(first.r, first.g, first.b)
+        if point >= self._points[-1]:
+            last = self.color_points[-1]
+            return RGB(last.r, last.g, last.b)
+
+        # points[idx - 1] <= point < points[idx], so the segment is never empty
+        idx = bisect_right(self._points, point)
+        p1 = self.color_points[idx - 1]
+        p2 = self.color_points[idx]
+        ratio = (point - p1.point) / (p2.point - p1.point)
+        return RGB(
+            p1.r + (p2.r - p1.r) * ratio,
+            p1.g + (p2.g - p1.g) * ratio,
+            p1.b + (p2.b - p1.b) * ratio,
+        )
+
+    def key(self) -> Tuple[Tuple[float, float, float, float], ...]:
+        """
+        Hashable identity of the keyframes, palettes with equal keyframes share memo tables
+        """
+        return tuple(
+            (color_point.point, color_point.r, color_point.g, color_point.b)
+            for color_point in self.color_points
+        )
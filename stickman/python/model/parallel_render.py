@@ -0,0 +1,151 @@
+import os
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from model.body import Body
+from model.framebuffer import Framebuffer
+from model.render_engine import RenderEngine
+from model.scene import Scene
+
+# Render target of the current worker process, sent once when the pool starts
+_target: Optional[Union[Body, Scene]] = None
+# Frame segments the worker attached, kept mapped for the life of the renderer
+_shared_memory: Dict[str, SharedMemory] = {}
+
+
+def _init_worker(target: Union[Body, Scene]):
+    global _target
+    _target = target
+
+
+def _attach(name: str) -> SharedMemory:
+    shared_memory = _shared_memory.get(name)
+    if shared_memory is None:
+        shared_memory = SharedMemory(name=name)
+        _shared_memory[name] = shared_memory
+    return shared_memory
+
+
+def _render_strips(
+    groups: List[List[Tuple[str, int]]], ratio: float, shared_memory_name: str
+):
+    """
+    Render one strip per group and write its frame to the offsets of every strip in the group
+    """
+    buf = _attach(shared_memory_name).buf
+    for group in groups:
+        name, _ = group[0]
+        frame = _target.strips[name].render(ratio)
+        for _, offset in group:
+            buf[offset : offset + len(frame)] = frame
+
+
+def _render_frames(
+    first_frame: int, last_frame: int, frame_count: int, shared_memory_name: str
+):
+    # Every loop gets a new segment, attach it only for this call so workers do not keep it mapped
+    loop_memory = SharedMemory(name=shared_memory_name)
+    try:
+        render_engine = RenderEngine(_target)
+        for index in range(first_frame, last_frame):
+            pixels = render_engine.render(index / frame_count).pixels
+            offset = index * len(pixels)
+            loop_memory.buf[offset : offset + len(pixels)] = pixels
+    finally:
+        loop_memory.close()
+
+
+class ParallelRenderer:
+    """
+    Renders strips, bodies or whole frame ranges on a process pool, frames come back through
+    shared memory instead of being pickled.
+
+    Workers get a copy of the target when the pool starts. Call reload() after changing color
+    algorithms or adjustment levels so they render the same thing as the serial RenderEngine.
+    """
+
+    def __init__(self, target: Union[Body, Scene], workers: Optional[int] = None):
+        self._target = target
+        self._workers = workers or os.cpu_count() or 1
+        self._lengths = {name: strip.length for name, strip in target.strips.items()}
+        self._frame_size = sum(self._lengths.values()) * 3
+        self._frame_memory = SharedMemory(create=True, size=max(1, self._frame_size))
+        self._pool = None
+        self.reload()
+
+    def reload(self):
+        """
+        Restart the workers with the current state of the target
+        """
+        if self._pool:
+            self._pool.terminate()
+            self._pool.join()
+        self._pool = Pool(
+            self._workers, initializer=_init_worker, initargs=(self._target,)
+        )
+        self._chunks = self._split_strips()
+
+    def _split_strips(self) -> List[List[List[Tuple[str, int]]]]:
+        # Strips with the same algorithm and length render identical frames, keep them together
+        framebuffer = Framebuffer(self._lengths)
+        groups: Dict[Tuple[int, int], List[Tuple[str, int]]] = {}
+        for name, strip in self._target.strips.items():
+            key = (id(strip.color_algorithm), strip.length)
+            groups.setdefault(key, []).append((name, framebuffer.offset(name)))
+
+        # Balance the workers by LED count, biggest groups first
+        chunks: List[List[List[Tuple[str, int]]]] = [[] for _ in range(self._workers)]
+        chunk_leds = [0] * self._workers
+        for (_, length), group in sorted(groups.items(), key=lambda item: -item[0][1]):
+            lightest = chunk_leds.index(min(chunk_leds))
+            chunks[lightest].append(group)
+            chunk_leds[lightest] += length
+        return [chunk for chunk in chunks if chunk]
+
+    def render(self, ratio: float) -> Framebuffer:
+        """
+        Render one frame with its strips split across the workers
+        """
+        self._pool.starmap(
+            _render_strips,
+            [(chunk, ratio, self._frame_memory.name) for chunk in self._chunks],
+        )
+        return Framebuffer(
+            self._lengths, bytearray(self._frame_memory.buf[: self._frame_size])
+        )
+
+    def render_frames(self, frame_count: int) -> Iterator[Framebuffer]:
+        """
+        Render one full loop split into frame_count frames, with contiguous frame ranges per worker
+        """
+        loop_memory = SharedMemory(
+            create=True, size=max(1, frame_count * self._frame_size)
+        )
+        try:
+            step = -(-frame_count // self._workers)
+            self._pool.starmap(
+                _render_frames,
+                [
+                    (
+                        first,
+                        min(first + step, frame_count),
+                        frame_count,
+                        loop_memory.name,
+                    )
+                    for first in range(0, frame_count, step)
+                ],
+            )
+            for index in range(frame_count):
+                start = index * self._frame_size
+                pixels = bytearray(loop_memory.buf[start : start + self._frame_size])
+                yield Framebuffer(self._lengths, pixels)
+        finally:
+            loop_memory.close()
+            loop_memory.unlink()
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+        self._frame_memory.close()
+        self._frame_memory.unlink()
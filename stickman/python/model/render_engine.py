@@ -0,0 +1,123 @@
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Union
+
+from model.body import Body
+from model.body_group import BodyGroup
+from model.frame_stats import FrameStats
+from model.framebuffer import Framebuffer
+from model.scene import Scene
+from output.output import Output
+
+# Duration of one full animation loop
+LOOP_TIME_MS = 2000
+
+
+class RenderEngine:
+    """
+    Computes body frames into an in-memory framebuffer and pushes them to any attached outputs.
+
+    Nothing here depends on a GUI, so frames can be generated headless and faster than real time.
+    Either a single Body or a whole Scene of bodies and strips can be rendered.
+    """
+
+    def __init__(
+        self,
+        body: Union[Body, Scene],
+        outputs: Optional[List[Output]] = None,
+        frame_stats: Optional[FrameStats] = None,
+    ):
+        self._body = body
+        self._lengths = {name: strip.length for name, strip in body.strips.items()}
+        self._frame_stats = frame_stats
+        self._strip_s: Dict[str, float] = {}
+        self._outputs: List[Output] = []
+        for output in outputs or []:
+            self.add_output(output)
+
+    @property
+    def body(self) -> Union[Body, Scene]:
+        return self._body
+
+    @property
+    def frame_stats(self) -> Optional[FrameStats]:
+        return self._frame_stats
+
+    @property
+    def strip_s(self) -> Dict[str, float]:
+        """
+        Seconds each strip took in the last render, only kept with frame stats
+        """
+        return self._strip_s
+
+    def add_output(self, output: Output):
+        output.open(self._body)
+        self._outputs.append(output)
+
+    def set_body_group(self, body_group: BodyGroup):
+        """
+        Color the body with a body group, or every body of a scene. Loose scene strips keep
+        their own algorithms
+        """
+        if isinstance(self._body, Scene):
+            for name in self._body.body_names:
+                self._body.set_body_group(name, body_group)
+            return
+
+        self._body.head.set_color_algorithm(body_group.head)
+        self._body.torso.set_color_algorithm(body_group.torso)
+        self._body.right_arm.set_color_algorithm(body_group.right_arm)
+        self._body.left_arm.set_color_algorithm(body_group.left_arm)
+        self._body.right_leg.set_color_algorithm(body_group.right_leg)
+        self._body.left_leg.set_color_algorithm(body_group.left_leg)
+
+    def set_adjustment_level(self, level: int):
+        for strip in self._body.strips.values():
+            strip.color_algorithm.set_adjustment_level(level)
+
+    def render(self, ratio: float) -> Framebuffer:
+        """
+        Compute one frame of every strip at the given ratio through the loop
+        """
+        framebuffer = Framebuffer(self._lengths)
+        # Strips with the same algorithm and length render identical frames, compute those once
+        rendered: Dict[tuple, bytearray] = {}
+        for name, strip in self._body.strips.items():
+            start = perf_counter()
+            key = (id(strip.color_algorithm), strip.length)
+            frame = rendered.get(key)
+            if frame is None:
+                frame = strip.render(ratio)
+                rendered[key] = frame
+            else:
+                strip.set_colors(frame)
+            framebuffer.set_strip(name, frame)
+            if self._frame_stats:
+                self._strip_s[name] = perf_counter() - start
+        return framebuffer
+
+    def present(self, framebuffer: Framebuffer):
+        for output in self._outputs:
+            output.write(framebuffer)
+
+    def update(self, ratio: float) -> Framebuffer:
+        start = perf_counter()
+        framebuffer = self.render(ratio)
+        rendered = perf_counter()
+        self.present(framebuffer)
+
+        if self._frame_stats:
+            self._frame_stats.record(
+                start, rendered - start, perf_counter() - rendered, self._strip_s
+            )
+        return framebuffer
+
+    def frames(self, frame_count: int) -> Iterator[Framebuffer]:
+        """
+        Render and present one full loop split into frame_count evenly spaced frames
+        """
+        for i in range(frame_count):
+            yield self.update(i / frame_count)
+
+    def close(self):
+        for output in self._outputs:
+            output.close()
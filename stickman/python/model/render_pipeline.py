@@ -0,0 +1,285 @@
+import asyncio
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Deque, Dict, List, Optional
+
+from model.framebuffer import Framebuffer
+from model.render_engine import LOOP_TIME_MS, RenderEngine
+from output.output import Output
+
+DEFAULT_RING_SIZE = 3
+DEFAULT_QUEUE_SIZE = 2
+# A full sink queue discards its oldest frame, so the sink always catches up to the latest
+DROP_OLDEST = "drop_oldest"
+# A full sink queue discards the incoming frame, so the sink finishes what it already has
+DROP_NEWEST = "drop_newest"
+DROP_POLICIES = [DROP_OLDEST, DROP_NEWEST]
+
+
+class PipelineFrame:
+    def __init__(
+        self,
+        index: int,
+        ratio: float,
+        deadline_s: float,
+        framebuffer: Framebuffer,
+        compute_s: float,
+        strip_s: Dict[str, float],
+    ):
+        self.index = index
+        self.ratio = ratio
+        self.deadline_s = deadline_s
+        self.framebuffer = framebuffer
+        self.compute_s = compute_s
+        self.strip_s = strip_s
+
+
+class SinkStage:
+    """
+    Feeds one output from its own bounded queue. With in_thread the writes run on a thread of
+    the sink's own, so a slow sink holds up neither rendering nor the other sinks.
+
+    A write that raises only loses that frame, the error is counted and passed to `on_error`.
+    """
+
+    def __init__(
+        self, output: Output, queue_size: int, drop_policy: str, in_thread: bool
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(
+                f"Unknown drop policy {drop_policy}, expected one of {DROP_POLICIES}"
+            )
+        self.output = output
+        self._queue_size = queue_size
+        self._drop_policy = drop_policy
+        self._executor = ThreadPoolExecutor(max_workers=1) if in_thread else None
+        self._queue: Optional[asyncio.Queue] = None
+        self._on_error: Optional[Callable[["SinkStage", Exception], None]] = None
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.write_errors = 0
+        self.last_error: Optional[Exception] = None
+        self.write_s = 0.0
+
+    @property
+    def write_ms(self) -> float:
+        return 1000 * self.write_s / self.frames_written if self.frames_written else 0.0
+
+    def offer(self, frame: PipelineFrame):
+        if self._queue.full():
+            if self._drop_policy == DROP_NEWEST:
+                self.frames_dropped += 1
+                return
+            self._queue.get_nowait()
+            self.frames_dropped += 1
+        self._queue.put_nowait(frame)
+
+    async def finish(self, discard: bool):
+        """
+        Let the stage end after the frames it has queued, or right away with discard
+        """
+        if discard:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+        else:
+            # Waits for the sink to make room, so every accepted frame is still written
+            await self._queue.put(None)
+
+    def start(
+        self, on_error: Optional[Callable[["SinkStage", Exception], None]] = None
+    ) -> "asyncio.Task":
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._on_error = on_error
+        return asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            frame = await self._queue.get()
+            if frame is None:
+                return
+
+            start = perf_counter()
+            try:
+                if self._executor is None:
+                    self.output.write(frame.framebuffer)
+                else:
+                    await loop.run_in_executor(
+                        self._executor, self.output.write, frame.framebuffer
+                    )
+            except Exception as error:
+                self.write_errors += 1
+                self.last_error = error
+                if self._on_error:
+                    self._on_error(self, error)
+                continue
+            self.write_s += perf_counter() - start
+            self.frames_written += 1
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.output.close()
+
+
+class RenderPipeline:
+    """
+    Renders frames ahead of their deadlines into a small ring, and hands each frame to every sink
+    once its deadline comes, through bounded per-sink queues.
+
+    Compute and output no longer run in series: rendering keeps up to `ring_size` frames ready
+    while sinks write, a slow sink only drops its own frames, and one render feeds every sink.
+    When rendering falls behind, frames whose deadline already passed are skipped.
+    """
+
+    def __init__(
+        self,
+        render_engine: RenderEngine,
+        target_hz: float,
+        ring_size: int = DEFAULT_RING_SIZE,
+        clock: Callable[[], float] = perf_counter,
+    ):
+        self._render_engine = render_engine
+        self._period_s = 1 / target_hz
+        self._ring_size = ring_size
+        self._clock = clock
+        self._ring: Deque[PipelineFrame] = deque()
+        self._sinks: List[SinkStage] = []
+        self._stopped = False
+        self.frames_presented = 0
+        self.frames_skipped = 0
+
+    @property
+    def sinks(self) -> List[SinkStage]:
+        return self._sinks
+
+    def add_sink(
+        self,
+        output: Output,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        drop_policy: str = DROP_OLDEST,
+        in_thread: bool = True,
+    ) -> SinkStage:
+        """
+        Open an output and feed it every presented frame. Outputs that must be written from the
+        event loop thread, e.g. a tkinter canvas, pass in_thread=False
+        """
+        output.open(self._render_engine.body)
+        sink = SinkStage(output, queue_size, drop_policy, in_thread)
+        self._sinks.append(sink)
+        return sink
+
+    def stop(self):
+        self._stopped = True
+
+    async def run(
+        self,
+        frame_count: Optional[int] = None,
+        on_frame: Optional[Callable[[PipelineFrame], None]] = None,
+        on_error: Optional[Callable[[SinkStage, Exception], None]] = None,
+    ):
+        """
+        Run until frame_count frames have been presented and written, or until stop() is called,
+        which drops the frames sinks have not written yet. on_error is called on the event loop
+        thread with the sink and the error whenever a sink fails to write a frame
+        """
+        self._stopped = False
+        ring_space = asyncio.Semaphore(self._ring_size)
+        ring_filled = asyncio.Semaphore(0)
+        sink_tasks = [sink.start(on_error) for sink in self._sinks]
+        start_s = self._clock()
+
+        producer = asyncio.ensure_future(
+            self._produce(start_s, frame_count, ring_space, ring_filled)
+        )
+        try:
+            await self._present(frame_count, ring_space, ring_filled, on_frame)
+        finally:
+            producer.cancel()
+            for sink in self._sinks:
+                await sink.finish(discard=self._stopped)
+            await asyncio.gather(*sink_tasks)
+
+    async def _produce(
+        self,
+        start_s: float,
+        frame_count: Optional[int],
+        ring_space: asyncio.Semaphore,
+        ring_filled: asyncio.Semaphore,
+    ):
+        index = 0
+        while frame_count is None or index < frame_count:
+            await ring_space.acquire()
+
+            # Skip frames that would be late before they are even rendered
+            due = math.floor((self._clock() - start_s) / self._period_s)
+            if due > index:
+                self.frames_skipped += due - index
+                if self._render_engine.frame_stats:
+                    self._render_engine.frame_stats.skip(due - index)
+                index = due
+            if frame_count is not None and index >= frame_count:
+                break
+
+            deadline_s = start_s + index * self._period_s
+            ratio = (index * self._period_s * 1000 % LOOP_TIME_MS) / LOOP_TIME_MS
+            render_start = self._clock()
+            framebuffer = self._render_engine.render(ratio)
+            compute_s = self._clock() - render_start
+
+            # The engine reuses its strip timings for the next render, keep this frame's own
+            strip_s = dict(self._render_engine.strip_s)
+            self._ring.append(
+                PipelineFrame(index, ratio, deadline_s, framebuffer, compute_s, strip_s)
+            )
+            ring_filled.release()
+            index += 1
+            # Let the presenter and sinks run between frames
+            await asyncio.sleep(0)
+
+        # Wake the presenter so it sees there is nothing left
+        ring_filled.release()
+
+    async def _present(
+        self,
+        frame_count: Optional[int],
+        ring_space: asyncio.Semaphore,
+        ring_filled: asyncio.Semaphore,
+        on_frame: Optional[Callable[[PipelineFrame], None]],
+    ):
+        frame_stats = self._render_engine.frame_stats
+        while not self._stopped:
+            await ring_filled.acquire()
+            if not self._ring:
+                return
+            frame = self._ring.popleft()
+            ring_space.release()
+
+            delay_s = frame.deadline_s - self._clock()
+            if delay_s > 0:
+                await asyncio.sleep(delay_s)
+            if self._stopped:
+                return
+
+            present_start = self._clock()
+            for sink in self._sinks:
+                sink.offer(frame)
+            if frame_stats:
+                frame_stats.record(
+                    present_start,
+                    frame.compute_s,
+                    self._clock() - present_start,
+                    frame.strip_s,
+                )
+            self.frames_presented += 1
+            if on_frame:
+                on_frame(frame)
+            if frame_count is not None and self.frames_presented >= frame_count:
+                return
+
+    def close(self):
+        for sink in self._sinks:
+            sink.close()
@@ -12,5 +12,8 @@ class RGB:
         self.g = _clamp(int(g))
         self.b = _clamp(int(b))
 
+    def as_bytes(self) -> bytes:
+        return bytes((self.r, self.g, self.b))
+
     def __str__(self):
         return f"({self.r}, {self.g}, {self.b})"
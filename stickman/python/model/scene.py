@@ -0,0 +1,85 @@
+from typing import Dict, List, Optional
+
+from model.body import Body
+from model.body_group import BodyGroup
+from model.color_algorithm import ColorAlgorithm
+from model.led import LEDStrip
+
+
+class Transform:
+    """
+    Placement of one scene instance, scaled around the origin and then offset
+    """
+
+    def __init__(self, dx: float = 0.0, dy: float = 0.0, scale: float = 1.0):
+        self.dx = dx
+        self.dy = dy
+        self.scale = scale
+
+
+class Scene:
+    """
+    Many bodies and loose strips rendered together. Give their algorithms one shared ColorMemo,
+    e.g. by building every body group with make_color_modes(color_memo), so configurations
+    that repeat across bodies compute their tables once.
+
+    Every instance gets its own placed copy of the strips, so the same Body can be added several
+    times with different transforms and color algorithms. Strips are named "<instance>/<strip>"
+    for bodies and "<instance>" for loose strips.
+    """
+
+    def __init__(self):
+        self._strips: Dict[str, LEDStrip] = {}
+        self._bodies: Dict[str, Dict[str, LEDStrip]] = {}
+
+    @property
+    def body_names(self) -> List[str]:
+        return list(self._bodies)
+
+    @property
+    def strips(self) -> Dict[str, LEDStrip]:
+        return self._strips
+
+    @property
+    def led_count(self) -> int:
+        return sum(strip.length for strip in self._strips.values())
+
+    def add_body(
+        self,
+        name: str,
+        body: Body,
+        body_group: BodyGroup,
+        transform: Optional[Transform] = None,
+    ):
+        strips = {}
+        for strip_name, strip in body.strips.items():
+            strips[strip_name] = self._place(f"{name}/{strip_name}", strip, transform)
+        self._bodies[name] = strips
+        self.set_body_group(name, body_group)
+
+    def add_strip(
+        self,
+        name: str,
+        strip: LEDStrip,
+        color_algorithm: ColorAlgorithm,
+        transform: Optional[Transform] = None,
+    ):
+        self._place(name, strip, transform).set_color_algorithm(color_algorithm)
+
+    def set_body_group(self, name: str, body_group: BodyGroup):
+        for strip_name, strip in self._bodies[name].items():
+            strip.set_color_algorithm(getattr(body_group, strip_name))
+
+    def set_color_algorithm(self, name: str, color_algorithm: ColorAlgorithm):
+        self._strips[name].set_color_algorithm(color_algorithm)
+
+    def _place(
+        self, name: str, strip: LEDStrip, transform: Optional[Transform]
+    ) -> LEDStrip:
+        if name in self._strips:
+            raise ValueError(f"Scene already has a strip named {name}")
+
+        transform = transform or Transform()
+        placed = strip.placed(transform.dx, transform.dy, transform.scale)
+        self._strips[name] = placed
+        return placed
@@ -0,0 +1,55 @@
+from typing import Callable
+
+
+class FrameWriter:
+    """
+    Writes one frame buffer to a non-blocking socket or file over as many calls as it takes.
+
+    The buffer is only refilled once nothing of it is pending any more, outputs drop the frames
+    that arrive meanwhile instead of queueing them, so a slow receiver never builds up latency.
+    """
+
+    def __init__(self, buffer: bytearray, send: Callable[[memoryview], int]):
+        # The buffer must keep its size, views of it stay exported while a frame is pending
+        self.buffer = buffer
+        self._send = send
+        self._pending = memoryview(b"")
+        self._bytes_sent = 0
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._bytes_sent
+
+    def ready(self) -> bool:
+        """
+        Write what is left of the previous frame, returns if the buffer may be refilled
+        """
+        return not self._pending or self.flush()
+
+    def start(self) -> None:
+        """
+        Start writing the frame just filled into the buffer
+        """
+        self._pending = memoryview(self.buffer)
+        self.flush()
+
+    def flush(self) -> bool:
+        """
+        Write as much of the pending frame as the receiver takes, returns if it was all written
+        """
+        try:
+            sent = self._send(self._pending)
+        except BlockingIOError:
+            return False
+        self._bytes_sent += sent
+        self._pending = self._pending[sent:]
+        return not self._pending
+
+    def finish(self, send_all: Callable[[memoryview], None]) -> None:
+        """
+        Write the rest of the pending frame with a blocking send, e.g. before closing
+        """
+        if self._pending:
+            send_all(self._pending)
+            self._bytes_sent += len(self._pending)
+            self._pending = memoryview(b"")
@@ -0,0 +1,60 @@
+from typing import Dict, Union
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class HexColorCache:
+    """
+    Tk color strings ("#rrggbb") of packed RGB colors, each formatted once.
+
+    Algorithms return colors from a few hundred memoized buckets, so once every color has been
+    seen each lookup is a hit. Past `max_entries` colors the oldest entry is dropped, e.g. when
+    interpolated strips produce many more distinct colors.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._strings: Dict[int, str] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def lookup(self, color: Union[bytes, bytearray, memoryview]) -> str:
+        key = int.from_bytes(color, "big")
+        hex_code = self._strings.get(key)
+        if hex_code is not None:
+            self._hits += 1
+            return hex_code
+
+        self._misses += 1
+        if len(self._strings) >= self._max_entries:
+            # Dicts keep insertion order, so the first key is the oldest
+            del self._strings[next(iter(self._strings))]
+            self._evictions += 1
+        hex_code = "#" + bytes(color).hex()
+        self._strings[key] = hex_code
+        return hex_code
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+# Shared by every canvas output, colors repeat across strips and bodies
+HEX_COLORS = HexColorCache()
@@ -0,0 +1,29 @@
+from model.body import Body
+from model.framebuffer import Framebuffer
+from model.led import RADIUS
+from output.output import Output
+from output.raster import Raster
+
+
+class ImageOutput(Output):
+    """
+    Writes every frame as a binary PPM image with the LEDs drawn as dots, no GUI required
+    """
+
+    def __init__(
+        self, path_pattern: str, width: int, height: int, radius: int = RADIUS
+    ):
+        # path_pattern is formatted with the frame index, e.g. "frames/{:04d}.ppm"
+        self._path_pattern = path_pattern
+        self._raster = Raster(width, height, radius)
+        self._frame_index = 0
+
+    def open(self, body: Body) -> None:
+        self._raster.open(body)
+
+    def write(self, framebuffer: Framebuffer) -> None:
+        ppm = self._raster.draw(framebuffer.pixels)
+        path = self._path_pattern.format(self._frame_index)
+        with open(path, "wb") as f:
+            f.write(ppm)
+        self._frame_index += 1
@@ -0,0 +1,288 @@
+import math
+import socket
+import struct
+import uuid
+from typing import Dict, List, Optional
+
+from model.body import Body
+from model.framebuffer import Framebuffer
+from output.frame_writer import FrameWriter
+from output.output import Output
+
+OPC_PORT = 7890
+OPC_SET_PIXELS = 0
+OPC_HEADER = struct.Struct(">BBH")
+# The length field is 16 bits
+OPC_MAX_LEDS = 0xFFFF // 3
+
+E131_PORT = 5568
+E131_HEADER_BYTES = 126
+E131_LEDS_PER_UNIVERSE = 170
+E131_PRIORITY = 100
+E131_MIN_UNIVERSE = 1
+E131_MAX_UNIVERSE = 63999
+_E131_PACKET_IDENTIFIER = b"ASC-E1.17\x00\x00\x00"
+_E131_VECTOR_ROOT_DATA = 0x00000004
+_E131_VECTOR_FRAMING_DATA = 0x00000002
+_E131_VECTOR_DMP_SET_PROPERTY = 0x02
+_E131_SEQUENCE_OFFSET = 111
+
+
+class NetworkOutput(Output):
+    """
+    Counters shared by the network outputs. A frame is dropped instead of sent when the socket
+    cannot take it without blocking.
+    """
+
+    def __init__(self):
+        self._frames_sent = 0
+        self._frames_dropped = 0
+        self._packets_sent = 0
+        self._bytes_sent = 0
+
+    @property
+    def frames_sent(self) -> int:
+        return self._frames_sent
+
+    @property
+    def frames_dropped(self) -> int:
+        return self._frames_dropped
+
+    @property
+    def packets_sent(self) -> int:
+        return self._packets_sent
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._bytes_sent
+
+
+class OpcOutput(NetworkOutput):
+    """
+    Streams frames to an Open Pixel Control server over TCP, one OPC channel per strip.
+
+    Every message of a frame is packed into one buffer and handed to a non-blocking socket in a
+    single send. While the previous frame is still being written out, new frames are dropped, so
+    a slow server never builds up latency.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = OPC_PORT,
+        channels: Optional[Dict[str, int]] = None,
+    ):
+        super().__init__()
+        self._address = (host, port)
+        # Strip name to OPC channel, strips not listed get the next free channel from 1
+        self._channels = dict(channels or {})
+        self._socket: Optional[socket.socket] = None
+        self._writer: Optional[FrameWriter] = None
+        self._messages: List[tuple] = []
+
+    @property
+    def channels(self) -> Dict[str, int]:
+        return self._channels
+
+    def open(self, body: Body) -> None:
+        next_channel = max(self._channels.values(), default=0) + 1
+        position = 0
+        for name, strip in body.strips.items():
+            if strip.length > OPC_MAX_LEDS:
+                raise ValueError(
+                    f"{name} has {strip.length} LEDs, OPC allows {OPC_MAX_LEDS}"
+                )
+            if name not in self._channels:
+                self._channels[name] = next_channel
+                next_channel += 1
+
+            # (strip, offset of its data in the frame buffer, data length)
+            self._messages.append((name, position + OPC_HEADER.size, strip.length * 3))
+            position += OPC_HEADER.size + strip.length * 3
+
+        frame = bytearray(position)
+        for name, data_start, data_length in self._messages:
+            OPC_HEADER.pack_into(
+                frame,
+                data_start - OPC_HEADER.size,
+                self._channels[name],
+                OPC_SET_PIXELS,
+                data_length,
+            )
+
+        self._socket = socket.create_connection(self._address)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.setblocking(False)
+        self._writer = FrameWriter(frame, self._socket.send)
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._writer.bytes_sent if self._writer else 0
+
+    def write(self, framebuffer: Framebuffer) -> None:
+        if not self._writer.ready():
+            self._frames_dropped += 1
+            return
+
+        frame = self._writer.buffer
+        for name, data_start, data_length in self._messages:
+            frame[data_start : data_start + data_length] = framebuffer.strip(name)
+        self._packets_sent += len(self._messages)
+        self._frames_sent += 1
+        self._writer.start()
+
+    def close(self) -> None:
+        if self._socket is None:
+            return
+        # Let the last frame finish rather than leave the server with half of it
+        self._socket.setblocking(True)
+        self._writer.finish(self._socket.sendall)
+        self._socket.close()
+        self._socket = None
+
+
+class E131Output(NetworkOutput):
+    """
+    Streams frames as E1.31 (sACN) DMX over UDP. Every strip starts on its own universe and
+    spans as many consecutive universes as it needs, 170 RGB LEDs each.
+
+    Packets are prebuilt in open(), a frame only copies LED data and the sequence number in and
+    sends every packet back to back on a non-blocking socket. When the socket buffer is full the
+    rest of the frame is dropped.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = E131_PORT,
+        universes: Optional[Dict[str, int]] = None,
+        source_name: str = "stickman",
+    ):
+        super().__init__()
+        self._address = (host, port)
+        # Strip name to its first universe, strips not listed follow on after every listed one
+        self._first_universes = dict(universes or {})
+        self._source_name = source_name
+        self._cid = uuid.uuid4().bytes
+        self._socket: Optional[socket.socket] = None
+        self._packets: List[tuple] = []
+        self._universes: Dict[str, List[int]] = {}
+        self._sequence = 0
+
+    @property
+    def universes(self) -> Dict[str, List[int]]:
+        return self._universes
+
+    def open(self, body: Body) -> None:
+        universe_counts = {
+            name: max(1, math.ceil(strip.length / E131_LEDS_PER_UNIVERSE))
+            for name, strip in body.strips.items()
+        }
+        # Strips without a configured universe go after every configured one
+        next_universe = max(
+            (
+                universe + universe_counts[name]
+                for name, universe in self._first_universes.items()
+                if name in universe_counts
+            ),
+            default=E131_MIN_UNIVERSE,
+        )
+        used: Dict[int, str] = {}
+        for name, strip in body.strips.items():
+            first_universe = self._first_universes.get(name)
+            if first_universe is None:
+                first_universe = next_universe
+                next_universe += universe_counts[name]
+            universes = list(
+                range(first_universe, first_universe + universe_counts[name])
+            )
+            for universe in universes:
+                if not E131_MIN_UNIVERSE <= universe <= E131_MAX_UNIVERSE:
+                    raise ValueError(
+                        f"{name} needs universe {universe}, E1.31 allows "
+                        f"{E131_MIN_UNIVERSE} to {E131_MAX_UNIVERSE}"
+                    )
+                if universe in used:
+                    raise ValueError(
+                        f"{name} and {used[universe]} both use universe {universe}"
+                    )
+                used[universe] = name
+            self._universes[name] = universes
+
+            for i, universe in enumerate(universes):
+                first_led = i * E131_LEDS_PER_UNIVERSE
+                led_count = min(E131_LEDS_PER_UNIVERSE, strip.length - first_led)
+                packet = self._make_packet(universe, led_count * 3)
+                # (packet, strip, first byte of the strip to copy, byte count)
+                self._packets.append((packet, name, first_led * 3, led_count * 3))
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def _make_packet(self, universe: int, data_length: int) -> bytearray:
+        length = E131_HEADER_BYTES + data_length
+        packet = bytearray(length)
+        # Root layer
+        struct.pack_into(
+            ">HH12sHI16s",
+            packet,
+            0,
+            0x0010,
+            0x0000,
+            _E131_PACKET_IDENTIFIER,
+            0x7000 | (length - 16),
+            _E131_VECTOR_ROOT_DATA,
+            self._cid,
+        )
+        # Framing layer, the sequence number is filled in per frame
+        struct.pack_into(
+            ">HI64sBHBBH",
+            packet,
+            38,
+            0x7000 | (length - 38),
+            _E131_VECTOR_FRAMING_DATA,
+            self._source_name.encode("utf-8")[:63],
+            E131_PRIORITY,
+            0,
+            0,
+            0,
+            universe,
+        )
+        # DMP layer, DMX start code 0 followed by the LED data
+        struct.pack_into(
+            ">HBBHHHB",
+            packet,
+            115,
+            0x7000 | (length - 115),
+            _E131_VECTOR_DMP_SET_PROPERTY,
+            0xA1,
+            0x0000,
+            0x0001,
+            data_length + 1,
+            0x00,
+        )
+        return packet
+
+    def write(self, framebuffer: Framebuffer) -> None:
+        # Every universe of a frame shares its sequence number
+        self._sequence = (self._sequence + 1) % 256
+        for packet, name, start, data_length in self._packets:
+            packet[_E131_SEQUENCE_OFFSET] = self._sequence
+            packet[E131_HEADER_BYTES:] = framebuffer.strip(name)[
+                start : start + data_length
+            ]
+
+        for packet, _, _, _ in self._packets:
+            try:
+                self._socket.sendto(packet, self._address)
+            except BlockingIOError:
+                self._frames_dropped += 1
+                return
+            self._packets_sent += 1
+            self._bytes_sent += len(packet)
+        self._frames_sent += 1
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
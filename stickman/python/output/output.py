@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+
+from model.body import Body
+from model.framebuffer import Framebuffer
+
+
+class Output(ABC):
+    """
+    Destination for rendered frames, e.g. a tkinter canvas, image files or LED hardware
+    """
+
+    def open(self, body: Body) -> None:
+        pass
+
+    @abstractmethod
+    def write(self, framebuffer: Framebuffer) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
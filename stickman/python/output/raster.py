@@ -0,0 +1,79 @@
+from typing import Dict, List, Union
+
+from model.body import Body
+from model.framebuffer import Framebuffer
+from model.led import RADIUS
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional, frames are drawn with a pure Python loop without it
+    np = None
+
+
+class Raster:
+    """
+    LEDs drawn as round dots into one packed RGB image, stored as a binary PPM.
+
+    Which framebuffer pixel covers each image pixel is worked out once in open(), so drawing a
+    frame is a single gather however many LEDs there are. Later LEDs are drawn on top.
+    """
+
+    def __init__(self, width: int, height: int, radius: int = RADIUS):
+        self.width = width
+        self.height = height
+        self._radius = radius
+        header = f"P6\n{width} {height}\n255\n".encode("ascii")
+        self._ppm = bytearray(header) + bytearray(width * height * 3)
+        self._image_start = len(header)
+        self._sources: List[int] = []
+        self._targets: List[int] = []
+
+    @property
+    def ppm(self) -> bytearray:
+        return self._ppm
+
+    def open(self, body: Body) -> None:
+        framebuffer = Framebuffer(
+            {name: strip.length for name, strip in body.strips.items()}
+        )
+        covering: Dict[int, int] = {}
+        for name, strip in body.strips.items():
+            first_pixel = framebuffer.offset(name) // 3
+            for idx, (x, y) in enumerate(zip(strip.xs, strip.ys)):
+                for target in self._dot_pixels(x, y):
+                    covering[target] = first_pixel + idx
+
+        self._targets = list(covering.keys())
+        self._sources = list(covering.values())
+        if np is not None:
+            self._targets = np.array(self._targets, dtype=np.intp)
+            self._sources = np.array(self._sources, dtype=np.intp)
+
+    def _dot_pixels(self, x: float, y: float) -> List[int]:
+        # Image pixels within the radius of (x, y), rounded like a small canvas oval
+        cx = round(x)
+        cy = round(y)
+        limit = self._radius * (self._radius + 1)
+        pixels = []
+        for py in range(cy - self._radius, cy + self._radius + 1):
+            for px in range(cx - self._radius, cx + self._radius + 1):
+                inside = (px - cx) ** 2 + (py - cy) ** 2 <= limit
+                if inside and 0 <= px < self.width and 0 <= py < self.height:
+                    pixels.append(py * self.width + px)
+        return pixels
+
+    def draw(self, pixels: Union[bytearray, memoryview]) -> bytearray:
+        """
+        Draw a frame of packed framebuffer pixels, returns the whole PPM
+        """
+        image = memoryview(self._ppm)[self._image_start :]
+        if np is not None:
+            np.frombuffer(image, dtype=np.uint8).reshape(-1, 3)[self._targets] = (
+                np.frombuffer(pixels, dtype=np.uint8).reshape(-1, 3)[self._sources]
+            )
+            return self._ppm
+
+        for target, source in zip(self._targets, self._sources):
+            image[target * 3 : target * 3 + 3] = pixels[source * 3 : source * 3 + 3]
+        return self._ppm
@@ -0,0 +1,189 @@
+import os
+import struct
+import termios
+import time
+import tty
+import zlib
+from typing import Callable, Optional
+
+from model.body import Body
+from model.framebuffer import Framebuffer
+from output.frame_writer import FrameWriter
+from output.output import Output
+
+# Frame layout, little endian:
+#   magic "LEDS", u16 sequence, u8 strip count, u16 LED count per strip,
+#   packed RGB bytes of every strip back to back, u32 CRC-32 of everything after the magic.
+# The controller answers every frame it has shown with ACK, or NAK when the checksum fails.
+MAGIC = b"LEDS"
+FRAME_HEADER = struct.Struct("<4sHB")
+STRIP_LENGTH = struct.Struct("<H")
+CHECKSUM = struct.Struct("<I")
+ACK = 0x06
+NAK = 0x15
+
+DEFAULT_BAUDRATE = 1000000
+# 8N1 sends a start and a stop bit with every byte
+BITS_PER_BYTE = 10
+DEFAULT_MAX_IN_FLIGHT = 2
+# Without an answer for this long, frames in flight are assumed lost
+DEFAULT_ACK_TIMEOUT_S = 0.5
+
+
+class SerialOutput(Output):
+    """
+    Streams frames to the LED controller over a serial port as checksummed binary frames.
+
+    The controller grants credits by acknowledging frames, at most `max_in_flight` frames are
+    unacknowledged at a time. A frame that arrives without credit, or while the previous frame is
+    still being written, is dropped rather than queued, so the strips never lag behind the render.
+
+    When the port fails, e.g. with EIO once the controller is unplugged, the link is lost: the
+    port is closed, every later frame is dropped and the error is kept in `link_error`.
+    """
+
+    def __init__(
+        self,
+        device: str,
+        baudrate: int = DEFAULT_BAUDRATE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        ack_timeout_s: float = DEFAULT_ACK_TIMEOUT_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._device = device
+        self._baudrate = baudrate
+        self._max_in_flight = max_in_flight
+        self._ack_timeout_s = ack_timeout_s
+        self._clock = clock
+        self._fd: Optional[int] = None
+        self._writer: Optional[FrameWriter] = None
+        self._link_error: Optional[OSError] = None
+        self._payload_start = 0
+        self._sequence = 0
+        self._in_flight = 0
+        self._last_answer_s = 0.0
+        self._open_s = 0.0
+
+        self._frames_sent = 0
+        self._frames_dropped = 0
+        self._frames_acked = 0
+        self._frames_rejected = 0
+
+    @property
+    def frames_sent(self) -> int:
+        return self._frames_sent
+
+    @property
+    def frames_dropped(self) -> int:
+        return self._frames_dropped
+
+    @property
+    def frames_acked(self) -> int:
+        return self._frames_acked
+
+    @property
+    def frames_rejected(self) -> int:
+        return self._frames_rejected
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._writer.bytes_sent if self._writer else 0
+
+    @property
+    def link_error(self) -> Optional[OSError]:
+        return self._link_error
+
+    @property
+    def utilization(self) -> float:
+        """
+        Share of the nominal line rate used since open, 1.0 is a saturated link
+        """
+        elapsed_s = self._clock() - self._open_s
+        if elapsed_s <= 0:
+            return 0.0
+        return self.bytes_sent * BITS_PER_BYTE / (self._baudrate * elapsed_s)
+
+    def open(self, body: Body) -> None:
+        lengths = [strip.length for strip in body.strips.values()]
+        if len(lengths) > 0xFF:
+            raise ValueError(f"{len(lengths)} strips, a serial frame holds at most 255")
+
+        header = bytearray(FRAME_HEADER.pack(MAGIC, 0, len(lengths)))
+        for length in lengths:
+            header += STRIP_LENGTH.pack(length)
+        self._payload_start = len(header)
+        frame = header + bytearray(sum(lengths) * 3 + CHECKSUM.size)
+
+        self._fd = os.open(self._device, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        tty.setraw(self._fd)
+        # USB serial, e.g. the Teensy, ignores the line speed and may run faster than any
+        # standard rate, the baudrate is then only used to measure utilization
+        speed = getattr(termios, f"B{self._baudrate}", None)
+        if speed is not None:
+            attributes = termios.tcgetattr(self._fd)
+            attributes[4] = speed
+            attributes[5] = speed
+            termios.tcsetattr(self._fd, termios.TCSANOW, attributes)
+        self._writer = FrameWriter(frame, lambda data: os.write(self._fd, data))
+        self._open_s = self._clock()
+        self._last_answer_s = self._open_s
+
+    def write(self, framebuffer: Framebuffer) -> None:
+        if self._fd is None:
+            self._frames_dropped += 1
+            return
+        try:
+            self._write(framebuffer)
+        except OSError as error:
+            self._lose_link(error)
+
+    def _write(self, framebuffer: Framebuffer):
+        self._read_answers()
+        if not self._writer.ready():
+            self._frames_dropped += 1
+            return
+
+        if self._in_flight >= self._max_in_flight:
+            if self._clock() - self._last_answer_s < self._ack_timeout_s:
+                self._frames_dropped += 1
+                return
+            self._in_flight = 0
+
+        frame = self._writer.buffer
+        self._sequence = (self._sequence + 1) % 0x10000
+        struct.pack_into("<H", frame, len(MAGIC), self._sequence)
+        checksum_start = len(frame) - CHECKSUM.size
+        frame[self._payload_start : checksum_start] = framebuffer.pixels
+        checksum = zlib.crc32(memoryview(frame)[len(MAGIC) : checksum_start])
+        CHECKSUM.pack_into(frame, checksum_start, checksum)
+
+        if self._in_flight == 0:
+            self._last_answer_s = self._clock()
+        self._in_flight += 1
+        self._frames_sent += 1
+        self._writer.start()
+
+    def _lose_link(self, error: OSError):
+        self._link_error = error
+        self._frames_dropped += 1
+        self.close()
+
+    def _read_answers(self):
+        try:
+            answers = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+
+        acked = answers.count(ACK)
+        rejected = answers.count(NAK)
+        if acked or rejected:
+            self._frames_acked += acked
+            self._frames_rejected += rejected
+            self._in_flight = max(0, self._in_flight - acked - rejected)
+            self._last_answer_s = self._clock()
+
+    def close(self) -> None:
+        if self._fd is None:
+            return
+        os.close(self._fd)
+        self._fd = None
@@ -0,0 +1,87 @@
+from tkinter import Canvas
+from typing import Dict, List, Optional
+
+from model.body import Body
+from model.framebuffer import Framebuffer
+from model.led import RADIUS, LEDStrip
+from output.hex_color_cache import HEX_COLORS, HexColorCache
+from output.output import Output
+
+
+class TkCanvasOutput(Output):
+    """
+    Draws every LED as an oval on a tkinter canvas.
+
+    The last color written to each oval is tracked, and only the LEDs that changed are pushed,
+    as one batched Tcl script per frame instead of one itemconfig round-trip per LED. Color
+    strings come from a shared HexColorCache, so steady state frames format no strings.
+    """
+
+    def __init__(self, canvas: Canvas, color_cache: Optional[HexColorCache] = None):
+        self._canvas = canvas
+        self._color_cache = HEX_COLORS if color_cache is None else color_cache
+        self._tk_ids: Dict[str, List[int]] = {}
+        # The start of each LED's itemconfigure command, built once per LED
+        self._commands: Dict[str, List[str]] = {}
+        self._last_written: Dict[str, bytearray] = {}
+        self._written = 0
+        self._skipped = 0
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    @property
+    def skipped(self) -> int:
+        return self._skipped
+
+    @property
+    def color_cache(self) -> HexColorCache:
+        return self._color_cache
+
+    def open(self, body: Body) -> None:
+        for name, strip in body.strips.items():
+            self._tk_ids[name] = [
+                self._create_circle(strip, idx) for idx in range(strip.length)
+            ]
+            self._commands[name] = [
+                f"{self._canvas} itemconfigure {tk_id} -fill "
+                for tk_id in self._tk_ids[name]
+            ]
+            self._last_written[name] = bytearray(strip.colors)
+
+    def _create_circle(self, strip: LEDStrip, idx: int) -> int:
+        x = strip.xs[idx]
+        y = strip.ys[idx]
+        x0 = x - RADIUS
+        y0 = y - RADIUS
+        x1 = x + RADIUS
+        y1 = y + RADIUS
+
+        hex_code = self._color_cache.lookup(strip.colors[idx * 3 : idx * 3 + 3])
+        return self._canvas.create_oval(x0, y0, x1, y1, fill=hex_code, outline=hex_code)
+
+    def write(self, framebuffer: Framebuffer) -> None:
+        commands = []
+        lookup = self._color_cache.lookup
+        for name, led_commands in self._commands.items():
+            frame = framebuffer.strip(name)
+            last_written = self._last_written[name]
+            if frame == last_written:
+                self._skipped += len(led_commands)
+                continue
+
+            for idx, led_command in enumerate(led_commands):
+                start = idx * 3
+                color = frame[start : start + 3]
+                if color == last_written[start : start + 3]:
+                    self._skipped += 1
+                    continue
+
+                last_written[start : start + 3] = color
+                hex_code = lookup(color)
+                commands.append(led_command + hex_code + " -outline " + hex_code)
+
+        if commands:
+            self._written += len(commands)
+            self._canvas.tk.eval("\n".join(commands))
@@ -0,0 +1,52 @@
+from tkinter import Canvas, PhotoImage
+from typing import Optional
+
+from model.body import Body
+from model.framebuffer import Framebuffer
+from model.led import RADIUS
+from output.output import Output
+from output.raster import Raster
+
+
+class TkImageOutput(Output):
+    """
+    Draws every LED into one PhotoImage on a tkinter canvas.
+
+    The frame is rasterized off screen and pushed with a single image put, so the canvas holds one
+    item and the Tcl cost of a frame does not grow with the LED count. Unchanged frames are skipped.
+    """
+
+    def __init__(self, canvas: Canvas, width: int, height: int, radius: int = RADIUS):
+        self._canvas = canvas
+        self._raster = Raster(width, height, radius)
+        self._photo: Optional[PhotoImage] = None
+        self._last_written: Optional[bytes] = None
+        self._written = 0
+        self._skipped = 0
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    @property
+    def skipped(self) -> int:
+        return self._skipped
+
+    def open(self, body: Body) -> None:
+        self._raster.open(body)
+        self._photo = PhotoImage(
+            master=self._canvas, width=self._raster.width, height=self._raster.height
+        )
+        image_id = self._canvas.create_image(0, 0, image=self._photo, anchor="nw")
+        # Keep overlay text drawn on the canvas above the LEDs
+        self._canvas.tag_lower(image_id)
+
+    def write(self, framebuffer: Framebuffer) -> None:
+        if self._last_written == framebuffer.pixels:
+            self._skipped += 1
+            return
+
+        self._last_written = bytes(framebuffer.pixels)
+        ppm = self._raster.draw(framebuffer.pixels)
+        self._photo.tk.call(self._photo.name, "put", bytes(ppm), "-format", "ppm")
+        self._written += 1
@@ -0,0 +1,64 @@
+"""
+Play a baked frame file on the simulator canvas, frames are streamed from a memory map as-is
+"""
+
+import argparse
+from time import monotonic
+from tkinter import Canvas, Tk
+
+from main import CANVAS_HEIGHT, CANVAS_WIDTH
+from model.body import make_body
+from model.frame_file import FrameFile
+from model.render_engine import RenderEngine
+from output.tk_canvas import TkCanvasOutput
+
+
+class Player:
+    def __init__(self, frame_file: FrameFile, mode: str):
+        self.root = Tk()
+        self.root.geometry(f"{CANVAS_WIDTH}x{CANVAS_HEIGHT}+100+100")
+        self.my_canvas = Canvas(
+            self.root, bg="black", width=CANVAS_WIDTH, height=CANVAS_HEIGHT
+        )
+
+        self.body = make_body(CANVAS_WIDTH, CANVAS_HEIGHT)
+        lengths = {name: strip.length for name, strip in self.body.strips.items()}
+        if lengths != frame_file.lengths:
+            raise ValueError("The frame file was baked for a different body layout")
+
+        self.render_engine = RenderEngine(self.body, [TkCanvasOutput(self.my_canvas)])
+        self.frame_file = frame_file
+        self.mode = mode
+
+        self.root.bind("<Escape>", lambda e: self.root.destroy())
+        self.start_time = monotonic()
+        self.my_canvas.pack()
+        self.play()
+
+        self.root.mainloop()
+
+    def play(self):
+        index = int((monotonic() - self.start_time) * self.frame_file.fps)
+        self.render_engine.present(self.frame_file.framebuffer(self.mode, index))
+        self.root.after(int(1000 / self.frame_file.fps), self.play)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="file written by bake.py")
+    parser.add_argument("--mode", default="rainbow")
+    args = parser.parse_args()
+
+    frame_file = FrameFile(args.path)
+    if args.mode not in frame_file.modes:
+        frame_file.close()
+        parser.error(
+            f"{args.path} has no mode {args.mode}, "
+            f"choose from {', '.join(frame_file.modes)}"
+        )
+    Player(frame_file, args.mode)
+    frame_file.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Render color modes headless into PPM images, no display required
+"""
+
+import argparse
+import os
+
+from model.body import make_body
+from model.color_memo import ColorMemo
+from model.color_modes import make_color_modes
+from model.render_engine import RenderEngine
+from output.image import ImageOutput
+
+IMAGE_WIDTH = 500
+IMAGE_HEIGHT = 700
+
+
+def main():
+    color_modes = make_color_modes(ColorMemo())
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=list(color_modes.keys()), default="rainbow")
+    parser.add_argument("--frames", type=int, default=60, help="frames per loop")
+    parser.add_argument("--output-dir", default="frames")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path_pattern = os.path.join(args.output_dir, args.mode + "_{:04d}.ppm")
+
+    render_engine = RenderEngine(make_body(IMAGE_WIDTH, IMAGE_HEIGHT))
+    render_engine.add_output(ImageOutput(path_pattern, IMAGE_WIDTH, IMAGE_HEIGHT))
+    render_engine.set_body_group(color_modes[args.mode])
+    for _ in render_engine.frames(args.frames):
+        pass
+    render_engine.close()
+
+
+if __name__ == "__main__":
+    main()
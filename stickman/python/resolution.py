@@ -0,0 +1,96 @@
+"""
+Measure the color error of bucket resolutions against exact evaluation, results are printed as JSON
+"""
+
+import argparse
+import json
+import sys
+from typing import Callable, Dict, List
+
+from model.color_algorithm import (
+    LinearColorAlgorithm,
+    PastelRGB,
+    PurpleGreenOrangeComet,
+    RainbowRGB,
+)
+from model.color_memo import ColorMemo
+
+DEFAULT_BUCKETS = [25, 50, 100, 200, 400]
+DEFAULT_SAMPLES = 10000
+
+ALGORITHMS: Dict[str, Callable[[ColorMemo, int, bool], LinearColorAlgorithm]] = {
+    "RainbowRGB": lambda memo, buckets, interpolate: RainbowRGB(
+        0, memo, num_buckets=buckets, interpolate=interpolate
+    ),
+    "PastelRGB": lambda memo, buckets, interpolate: PastelRGB(
+        0, memo, num_buckets=buckets, interpolate=interpolate
+    ),
+    "Comet": lambda memo, buckets, interpolate: PurpleGreenOrangeComet(
+        0, memo, num_buckets=buckets, interpolate=interpolate
+    ),
+}
+
+
+def measure(algorithm: LinearColorAlgorithm, samples: int) -> Dict[str, float]:
+    """
+    Channel error of the bucketed lookup over `samples` evenly spread positions, in 0-255 steps
+    """
+    # Offset by half a sample so positions do not line up with bucket starts
+    errors = []
+    for i in range(samples):
+        percent = (i + 0.5) / samples
+        looked_up = algorithm.evaluate(percent, 0, 0)
+        exact = algorithm.exact_color(percent)
+        errors += [
+            abs(looked_up.r - exact.r),
+            abs(looked_up.g - exact.g),
+            abs(looked_up.b - exact.b),
+        ]
+
+    return {
+        "mean_error": sum(errors) / len(errors),
+        "max_error": max(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--buckets",
+        type=int,
+        nargs="+",
+        default=DEFAULT_BUCKETS,
+        help="resolutions to compare",
+    )
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument(
+        "--output", help="write the JSON results here instead of stdout"
+    )
+    args = parser.parse_args()
+
+    results: List[Dict] = []
+    for name, make_algorithm in ALGORITHMS.items():
+        for num_buckets in args.buckets:
+            for interpolate in [False, True]:
+                color_memo = ColorMemo()
+                algorithm = make_algorithm(color_memo, num_buckets, interpolate)
+                algorithm.precompute(0)
+                results.append(
+                    {
+                        "subject": name,
+                        "buckets": num_buckets,
+                        "interpolate": interpolate,
+                        "table_bytes": color_memo.resident_bytes,
+                        **measure(algorithm, args.samples),
+                    }
+                )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()